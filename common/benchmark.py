@@ -0,0 +1,341 @@
+"""
+Benchmark the advent of code solvers with repeated, warmed up timings
+
+usage (from the repository root):
+    python3 -m common.benchmark --days 1-5 --repeats 10 --output baseline.json
+    python3 -m common.benchmark --days 1-5 --compare baseline.json
+    python3 -m common.benchmark --days 1,4 --sizes 100,1000 --csv scaling.csv
+"""
+__author__ = "Conner Beard"
+
+import argparse
+import inspect
+import json
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from common.generators import write_input
+from common.runner import find_days, load_day, parse_selection
+
+
+def find_loader(module):
+    """
+    Find the input parsing function of a day module. A day whose default
+    mode parses with a different loader names it in DEFAULT_LOADER, most
+    other days call it load_puzzle_input but some early days use a more
+    descriptive load_* name
+
+    Args:
+        module: an imported dayN/main.py module
+
+    Returns:
+        the loader function or None if the day has no loader, a cached loader
+        is unwrapped so the real parse is what gets timed
+    """
+    if hasattr(module, 'DEFAULT_LOADER'):
+        loader = getattr(module, module.DEFAULT_LOADER)
+    else:
+        loader = getattr(module, 'load_puzzle_input', None)
+    if loader is None:
+        for name, value in vars(module).items():
+            if (name.startswith('load_') and inspect.isfunction(value) and
+                    value.__module__ == module.__name__):
+                loader = value
+                break
+    return getattr(loader, '__wrapped__', loader)
+
+
+def time_call(func, args=(), warmup=1, repeats=5):
+    """
+    Time repeated calls of func after a number of untimed warmup calls
+
+    Args:
+        func (callable): function to time
+
+        args (tuple): positional arguments passed to func
+
+        warmup (int): number of untimed calls made first
+
+        repeats (int): number of timed calls
+
+    Returns:
+        samples (list of int): duration of each timed call in nanoseconds
+    """
+    for _ in range(warmup):
+        func(*args)
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        func(*args)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def summarize(samples):
+    """
+    Reduce timing samples to summary statistics
+
+    Args:
+        samples (list of int): durations in nanoseconds
+
+    Returns:
+        (dict): median, p95, min and max durations in nanoseconds along with
+        the number of samples
+    """
+    ordered = sorted(samples)
+    p95_index = max(math.ceil(0.95 * len(ordered)) - 1, 0)
+    return {'median_ns': int(statistics.median(ordered)),
+            'p95_ns': ordered[p95_index],
+            'min_ns': ordered[0],
+            'max_ns': ordered[-1],
+            'repeats': len(ordered)}
+
+
+def peak_memory(func, args=()):
+    """
+    Measure the peak python heap allocation of a single call
+
+    Args:
+        func (callable): function to measure
+
+        args (tuple): positional arguments passed to func
+
+    Returns:
+        (int): peak traced memory during the call in bytes
+    """
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_day(day, parts=(1, 2), input_name='input.txt', warmup=1,
+                  repeats=5):
+    """
+    Time the loader and each solver of a day separately
+
+    Args:
+        day (int): day number
+
+        parts (list of int): puzzle parts to time
+
+        input_name (str): name of the input file inside the day directory
+
+        warmup (int): number of untimed calls made before timing
+
+        repeats (int): number of timed calls
+
+    Returns:
+        results (dict of str: dict): summary statistics keyed by stage name,
+        "load" for the input parser and "part_N" for the solvers
+    """
+    module = load_day(day)
+    file_name = os.path.join(os.path.dirname(module.__file__), input_name)
+
+    results = {}
+    loader = find_loader(module)
+    if loader is not None:
+        results['load'] = summarize(time_call(loader, (file_name,),
+                                              warmup, repeats))
+    for part in parts:
+        solver = getattr(module, f'solve_part_{part}', None)
+        if solver is None:
+            continue
+        results[f'part_{part}'] = summarize(time_call(solver, (file_name,),
+                                                      warmup, repeats))
+    return results
+
+
+def scale_day(day, sizes, parts=(1, 2), seed=0, repeats=1):
+    """
+    Time the loader and solvers of a day on generated inputs of increasing
+    size to show how each stage scales
+
+    Args:
+        day (int): day number
+
+        sizes (list of int): generated input sizes to measure
+
+        parts (list of int): puzzle parts to measure
+
+        seed (int): random seed for the generated inputs
+
+        repeats (int): number of timed calls per stage and size
+
+    Returns:
+        rows (list of dict): day, size, stage, median_ns and peak_bytes for
+        each measurement
+    """
+    module = load_day(day)
+    stages = []
+    loader = find_loader(module)
+    if loader is not None:
+        stages.append(('load', loader))
+    for part in parts:
+        solver = getattr(module, f'solve_part_{part}', None)
+        if solver is not None:
+            stages.append((f'part_{part}', solver))
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            file_name = write_input(os.path.join(directory, f'{size}.txt'),
+                                    day, size, seed)
+            for stage, func in stages:
+                samples = time_call(func, (file_name,), 0, repeats)
+                rows.append({'day': day, 'size': size, 'stage': stage,
+                             'median_ns': int(statistics.median(samples)),
+                             'peak_bytes': peak_memory(func, (file_name,))})
+    return rows
+
+
+def compare(results, baseline, threshold=0.1):
+    """
+    Compare benchmark results against a stored baseline
+
+    Args:
+        results (dict): benchmark results keyed by day then stage
+
+        baseline (dict): previously stored benchmark results
+
+        threshold (float): allowed fractional slowdown of the median before a
+        stage counts as a regression
+
+    Returns:
+        regressions (list of (day, stage, baseline_ns, current_ns))
+    """
+    regressions = []
+    for day, stages in results.items():
+        for stage, stats in stages.items():
+            previous = baseline.get(day, {}).get(stage)
+            if previous is None:
+                continue
+            limit = previous['median_ns'] * (1 + threshold)
+            if stats['median_ns'] > limit:
+                regressions.append((day, stage, previous['median_ns'],
+                                    stats['median_ns']))
+    return regressions
+
+
+def format_table(results):
+    """
+    Format benchmark results as a fixed width text table
+
+    Args:
+        results (dict): benchmark results keyed by day then stage
+
+    Returns:
+        (str): the table
+    """
+    lines = [f"{'day':>4} {'stage':<8} {'median ms':>12} {'p95 ms':>12} "
+             f"{'min ms':>12}"]
+    for day, stages in results.items():
+        for stage, stats in stages.items():
+            lines.append(f"{day:>4} {stage:<8} "
+                         f"{stats['median_ns'] / 1e6:>12.3f} "
+                         f"{stats['p95_ns'] / 1e6:>12.3f} "
+                         f"{stats['min_ns'] / 1e6:>12.3f}")
+    return '\n'.join(lines)
+
+
+def format_scaling(rows):
+    """
+    Format scaling measurements as a fixed width text table
+
+    Args:
+        rows (list of dict): measurements from scale_day
+
+    Returns:
+        (str): the table
+    """
+    lines = [f"{'day':>4} {'size':>10} {'stage':<8} {'median ms':>12} "
+             f"{'peak MB':>10}"]
+    for row in rows:
+        lines.append(f"{row['day']:>4} {row['size']:>10} {row['stage']:<8} "
+                     f"{row['median_ns'] / 1e6:>12.3f} "
+                     f"{row['peak_bytes'] / 1e6:>10.3f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--days', default=None,
+                        help='days to run, e.g. "1-13" or "1,4,6" (default all)')
+    parser.add_argument('--parts', default='1,2',
+                        help='parts to run, e.g. "1,2" (default 1,2)')
+    parser.add_argument('--input', default='input.txt',
+                        help='input file name inside each day directory')
+    parser.add_argument('--warmup', type=int, default=1,
+                        help='untimed calls before timing (default 1)')
+    parser.add_argument('--repeats', type=int, default=5,
+                        help='timed calls per stage (default 5)')
+    parser.add_argument('--output', default=None,
+                        help='write results to this json file')
+    parser.add_argument('--compare', default=None,
+                        help='json baseline to check for regressions against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='allowed fractional slowdown (default 0.1)')
+    parser.add_argument('--sizes', default=None,
+                        help='measure scaling on generated inputs of these '
+                        'sizes, e.g. "100,1000,10000"')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed for generated inputs (default 0)')
+    parser.add_argument('--csv', default=None,
+                        help='write scaling measurements to this csv file')
+    args = parser.parse_args(argv)
+
+    available = find_days()
+    if args.days is None:
+        days = list(available)
+    else:
+        days = parse_selection(args.days)
+    missing = [day for day in days if day not in available]
+    if missing:
+        parser.error(f'no solver found for day(s) {missing}')
+    parts = parse_selection(args.parts)
+
+    if args.sizes is not None:
+        rows = []
+        for day in days:
+            rows.extend(scale_day(day, parse_selection(args.sizes), parts,
+                                  args.seed, args.repeats))
+        print(format_scaling(rows))
+        if args.csv is not None:
+            with open(args.csv, 'w') as file:
+                file.write('day,size,stage,median_ns,peak_bytes\n')
+                for row in rows:
+                    file.write(f"{row['day']},{row['size']},{row['stage']},"
+                               f"{row['median_ns']},{row['peak_bytes']}\n")
+        return 0
+
+    results = {}
+    for day in days:
+        results[str(day)] = benchmark_day(day, parts, args.input,
+                                          args.warmup, args.repeats)
+    print(format_table(results))
+
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, 'r') as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold)
+        for day, stage, previous, current in regressions:
+            print(f"Regression day {day} {stage}: median "
+                  f"{previous / 1e6:.3f} ms -> {current / 1e6:.3f} ms")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Cache of parsed puzzle inputs keyed by the input file's content
+
+Decorate a day's load_puzzle_input with cached_parse and repeated loads of
+an unchanged file are unpickled from the cache instead of being parsed
+again. The AOC_PARSE_CACHE environment variable selects the mode:
+    off     always parse
+    memory  keep parsed inputs in process memory (default)
+    disk    also keep them in AOC_PARSE_CACHE_DIR so other processes and
+            later runs share them
+"""
+__author__ = "Conner Beard"
+
+import functools
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+COMMON_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(COMMON_DIRECTORY)
+DEFAULT_DIRECTORY = os.path.join(REPO_ROOT, '.parse_cache')
+# bump to invalidate every cached parse when shared parsing code changes
+CACHE_VERSION = 1
+
+
+class ParseCache():
+    """
+    Two level LRU cache of pickled parse results, a size bounded in memory
+    OrderedDict in front of a size bounded directory of pickle files
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, memory_limit=64 << 20,
+                 disk_limit=512 << 20):
+        """
+        Args:
+            directory (str): directory holding the on disk cache
+
+            memory_limit (int): maximum bytes of pickled data kept in memory
+
+            disk_limit (int): maximum bytes of pickle files kept on disk
+        """
+        self.directory = directory
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._digests = {}
+
+    def too_large(self, file_name, use_disk=False):
+        """
+        A parse is at least about as large as the file it came from, so a
+        file over the limits would only be hashed and pickled to be thrown
+        away
+
+        Args:
+            file_name (str): the file to be parsed
+
+            use_disk (bool): whether the on disk cache is in use
+
+        Returns:
+            (bool): True if the parse of file_name is not worth caching
+        """
+        size = os.path.getsize(file_name)
+        if use_disk:
+            return size > max(self.memory_limit, self.disk_limit)
+        return size > self.memory_limit
+
+    def file_digest(self, file_name):
+        """
+        Hash the content of a file, the hash is only recomputed when the
+        file's path, size or modification time change
+
+        Args:
+            file_name (str): file to hash
+
+        Returns:
+            (str): hex digest of the file content
+        """
+        stat = os.stat(file_name)
+        signature = (os.path.abspath(file_name), stat.st_mtime_ns,
+                     stat.st_size)
+        digest = self._digests.get(signature)
+        if digest is None:
+            hasher = hashlib.blake2b(digest_size=16)
+            with open(file_name, 'rb') as file:
+                for block in iter(lambda: file.read(1 << 20), b''):
+                    hasher.update(block)
+            digest = hasher.hexdigest()
+            self._digests[signature] = digest
+        return digest
+
+    def key(self, func, file_name, args=(), kwargs=None):
+        """
+        Build the cache key of one parse
+
+        Args:
+            func (callable): the parsing function
+
+            file_name (str): the parsed file
+
+            args (tuple): extra positional arguments to func
+
+            kwargs (dict): extra keyword arguments to func
+
+        Returns:
+            (str): hex cache key
+        """
+        code_file = func.__code__.co_filename
+        parts = [str(CACHE_VERSION), code_file, func.__qualname__,
+                 str(os.stat(code_file).st_mtime_ns),
+                 self.file_digest(file_name), repr(args),
+                 repr(sorted((kwargs or {}).items()))]
+        # loaders build on the shared modules (grid, loader, ...), editing
+        # any of them must not serve parses made by the old code
+        for name in sorted(os.listdir(COMMON_DIRECTORY)):
+            if name.endswith('.py'):
+                path = os.path.join(COMMON_DIRECTORY, name)
+                parts.append(f'{name}:{os.stat(path).st_mtime_ns}')
+        return hashlib.blake2b('\0'.join(parts).encode(),
+                               digest_size=16).hexdigest()
+
+    def get(self, key, use_disk=False):
+        """
+        Args:
+            key (str): cache key
+
+            use_disk (bool): look in the on disk cache after memory
+
+        Returns:
+            (bytes): the pickled parse result or None on a miss
+        """
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            return data
+        if not use_disk:
+            return None
+        path = os.path.join(self.directory, key + '.pickle')
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            # the modification time orders the on disk LRU
+            os.utime(path)
+        except OSError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def put(self, key, data, use_disk=False):
+        """
+        Args:
+            key (str): cache key
+
+            data (bytes): the pickled parse result
+
+            use_disk (bool): also write the result to the on disk cache
+        """
+        self._remember(key, data)
+        if not use_disk or len(data) > self.disk_limit:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, key + '.pickle')
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(data)
+        os.replace(temporary, path)
+        self._evict_disk()
+
+    def clear(self):
+        """
+        Empty the in memory and on disk caches
+        """
+        self._memory.clear()
+        self._memory_size = 0
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith('.pickle'):
+                    os.remove(os.path.join(self.directory, name))
+
+    def _remember(self, key, data):
+        if len(data) > self.memory_limit:
+            return
+        if key in self._memory:
+            self._memory_size = self._memory_size - len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_size = self._memory_size + len(data)
+        while self._memory_size > self.memory_limit:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size = self._memory_size - len(evicted)
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.pickle'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total = total - size
+
+
+parse_cache = ParseCache(os.environ.get('AOC_PARSE_CACHE_DIR',
+                                        DEFAULT_DIRECTORY))
+
+
+def cached_parse(func):
+    """
+    Decorator for puzzle input loaders taking the input file name as their
+    first argument. Every call returns a fresh copy of the parsed input, so
+    solvers are free to modify what they are given.
+
+    Args:
+        func (callable): the loader to wrap
+
+    Returns:
+        (callable): the caching loader, the original is kept as __wrapped__
+    """
+    @functools.wraps(func)
+    def wrapper(file_name, *args, **kwargs):
+        mode = os.environ.get('AOC_PARSE_CACHE', 'memory')
+        if mode == 'off':
+            return func(file_name, *args, **kwargs)
+        use_disk = mode == 'disk'
+        if parse_cache.too_large(file_name, use_disk):
+            return func(file_name, *args, **kwargs)
+        key = parse_cache.key(func, file_name, args, kwargs)
+        data = parse_cache.get(key, use_disk)
+        if data is not None:
+            return pickle.loads(data)
+        result = func(file_name, *args, **kwargs)
+        parse_cache.put(key, pickle.dumps(result, pickle.HIGHEST_PROTOCOL),
+                        use_disk)
+        return result
+    return wrapper
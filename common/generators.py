@@ -0,0 +1,459 @@
+"""
+Synthetic puzzle input generators, one per day, used to measure how the
+solvers scale beyond the size of the real puzzle inputs
+
+usage (from the repository root):
+    python3 -m common.generators --day 6 --size 1000 --seed 0 --output big.txt
+"""
+__author__ = "Conner Beard"
+
+import argparse
+import math
+import random
+import sys
+
+
+def generate_day1(size, seed=0):
+    """
+    Args:
+        size (int): number of location id pairs
+
+        seed (int): random seed
+
+    Returns:
+        (str): two location ids per line seperated by whitespace
+    """
+    rng = random.Random(seed)
+    # draw from a limited pool so the similarity score has repeats to count
+    pool = [rng.randint(10000, 99999) for _ in range(max(size // 2, 1))]
+    lines = []
+    for _ in range(size):
+        lines.append(f"{rng.choice(pool)}   {rng.choice(pool)}\n")
+    return ''.join(lines)
+
+
+def generate_day2(size, seed=0):
+    """
+    Args:
+        size (int): number of reactor reports
+
+        seed (int): random seed
+
+    Returns:
+        (str): one report per line, levels seperated by whitespace
+    """
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(size):
+        length = rng.randint(5, 8)
+        direction = rng.choice([-1, 1])
+        level = rng.randint(10, 90)
+        report = [level]
+        for _ in range(length - 1):
+            level = level + direction * rng.randint(1, 3)
+            report.append(level)
+        # break some reports so all safety cases show up
+        for _ in range(rng.choice([0, 0, 1, 1, 2])):
+            report[rng.randrange(length)] = report[rng.randrange(length)] + \
+                rng.randint(-4, 4)
+        lines.append(' '.join(map(str, report)) + '\n')
+    return ''.join(lines)
+
+
+def generate_day3(size, seed=0):
+    """
+    Args:
+        size (int): number of instructions (valid or corrupted)
+
+        seed (int): random seed
+
+    Returns:
+        (str): corrupted computer memory
+    """
+    rng = random.Random(seed)
+    junk = "!@#$%^&*()[]{}<>?,.;:'+-_=~ \nwhymuldon'tselectfrom"
+    pieces = []
+    for _ in range(size):
+        choice = rng.random()
+        if choice < 0.6:
+            pieces.append(f"mul({rng.randint(1, 999)},{rng.randint(1, 999)})")
+        elif choice < 0.7:
+            pieces.append("do()")
+        elif choice < 0.8:
+            pieces.append("don't()")
+        elif choice < 0.9:
+            # corrupted instruction that must not match
+            pieces.append(f"mul({rng.randint(1, 999)} ,{rng.randint(1, 999)}]")
+        pieces.append(''.join(rng.choice(junk)
+                              for _ in range(rng.randint(0, 8))))
+    return ''.join(pieces) + '\n'
+
+
+def _generate_grid(size, alphabet, seed):
+    rng = random.Random(seed)
+    return ''.join(''.join(rng.choice(alphabet) for _ in range(size)) + '\n'
+                   for _ in range(size))
+
+
+def generate_day4(size, seed=0):
+    """
+    Args:
+        size (int): width and height of the crossword
+
+        seed (int): random seed
+
+    Returns:
+        (str): crossword of X, M, A and S
+    """
+    return _generate_grid(size, 'XMAS', seed)
+
+
+def generate_day5(size, seed=0, pages=49):
+    """
+    Args:
+        size (int): number of page orders
+
+        seed (int): random seed
+
+        pages (int): number of distinct page numbers (at most 90)
+
+    Returns:
+        (str): page ordering rules followed by a blank line and page orders
+    """
+    rng = random.Random(seed)
+    page_numbers = rng.sample(range(10, 100), pages)
+    lines = []
+    # the rules describe one full ordering of the pages, one rule per pair, so
+    # every order can be repaired
+    for index, first in enumerate(page_numbers):
+        for second in page_numbers[index + 1:]:
+            lines.append(f"{first}|{second}\n")
+    rng.shuffle(lines)
+    lines.append('\n')
+    for _ in range(size):
+        length = rng.randrange(5, min(pages, 23) + 1, 2)
+        order = rng.sample(page_numbers, length)
+        if rng.random() < 0.5:
+            order.sort(key=page_numbers.index)
+        lines.append(','.join(map(str, order)) + '\n')
+    return ''.join(lines)
+
+
+def _patrol_length(rows, row, col):
+    height = len(rows)
+    width = len(rows[0])
+    moves = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+    heading = 0
+    seen = set()
+    while True:
+        if (row, col, heading) in seen:
+            return None
+        seen.add((row, col, heading))
+        next_row = row + moves[heading][0]
+        next_col = col + moves[heading][1]
+        if not ((0 <= next_row < height) and (0 <= next_col < width)):
+            return len(seen)
+        if rows[next_row][next_col] == '#':
+            heading = (heading + 1) % 4
+        else:
+            row = next_row
+            col = next_col
+
+
+def generate_day6(size, seed=0, density=0.05):
+    """
+    Args:
+        size (int): width and height of the room map
+
+        seed (int): random seed
+
+        density (float): fraction of the map covered by obstacles
+
+    Returns:
+        (str): room map with obstacles and a guard whose patrol leaves the map
+        after at least size steps
+    """
+    rng = random.Random(seed)
+    while True:
+        rows = [['#' if rng.random() < density else '.' for _ in range(size)]
+                for _ in range(size)]
+        row = rng.randrange(size)
+        col = rng.randrange(size)
+        rows[row][col] = '.'
+        # part 1 never terminates if the unmodified patrol is a loop
+        length = _patrol_length(rows, row, col)
+        if (length is not None) and (length >= size):
+            rows[row][col] = '^'
+            return ''.join(''.join(line) + '\n' for line in rows)
+
+
+def generate_day7(size, seed=0):
+    """
+    Args:
+        size (int): number of equations
+
+        seed (int): random seed
+
+    Returns:
+        (str): one equation per line, answer then operands
+    """
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(size):
+        # keep answers below 2**63 so they fit fixed width integers
+        operands = [rng.randint(1, 99) for _ in range(rng.randint(2, 8))]
+        if rng.random() < 0.5:
+            answer = operands[0]
+            for operand in operands[1:]:
+                operator = rng.choice('+*|')
+                if operator == '+':
+                    answer = answer + operand
+                elif operator == '*':
+                    answer = answer * operand
+                else:
+                    answer = int(str(answer) + str(operand))
+        else:
+            answer = rng.randint(1, 10 ** rng.randint(2, 14))
+        lines.append(f"{answer}: {' '.join(map(str, operands))}\n")
+    return ''.join(lines)
+
+
+def generate_day8(size, seed=0, density=0.04):
+    """
+    Args:
+        size (int): width and height of the antenna map
+
+        seed (int): random seed
+
+        density (float): fraction of the map covered by antennas
+
+    Returns:
+        (str): map of antennas labelled by frequency
+    """
+    rng = random.Random(seed)
+    frequencies = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+    lines = []
+    for _ in range(size):
+        lines.append(''.join(rng.choice(frequencies)
+                             if rng.random() < density else '.'
+                             for _ in range(size)) + '\n')
+    return ''.join(lines)
+
+
+def generate_day9(size, seed=0):
+    """
+    Args:
+        size (int): number of digits in the disk map, rounded up to odd so the
+        map ends with a file
+
+        seed (int): random seed
+
+    Returns:
+        (str): disk map of alternating file and free space lengths
+    """
+    rng = random.Random(seed)
+    digits = []
+    for index in range(size + (1 - size % 2)):
+        if index % 2 == 0:
+            digits.append(str(rng.randint(1, 9)))
+        else:
+            digits.append(str(rng.randint(0, 9)))
+    return ''.join(digits) + '\n'
+
+
+def generate_day10(size, seed=0, peak_spacing=10):
+    """
+    Args:
+        size (int): width and height of the topographic map
+
+        seed (int): random seed
+
+        peak_spacing (int): average distance between height 9 peaks
+
+    Returns:
+        (str): map of heights 0-9 sloping away from scattered peaks so trails
+        exist
+    """
+    rng = random.Random(seed)
+    # breadth first search out from every peak, height drops by one per step
+    distance = [[None] * size for _ in range(size)]
+    frontier = []
+    for _ in range(max((size // peak_spacing) ** 2, 1)):
+        row = rng.randrange(size)
+        col = rng.randrange(size)
+        distance[row][col] = 0
+        frontier.append((row, col))
+    while frontier:
+        next_frontier = []
+        for row, col in frontier:
+            for row_adder, col_adder in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
+                target_row = row + row_adder
+                target_col = col + col_adder
+                if ((0 <= target_row < size) and (0 <= target_col < size) and
+                        distance[target_row][target_col] is None):
+                    distance[target_row][target_col] = distance[row][col] + 1
+                    next_frontier.append((target_row, target_col))
+        frontier = next_frontier
+
+    lines = []
+    for row in range(size):
+        line = []
+        for col in range(size):
+            if rng.random() < 0.05:
+                # noise breaks up some of the trails
+                line.append(str(rng.randint(0, 9)))
+            else:
+                line.append(str(max(9 - distance[row][col], 0)))
+        lines.append(''.join(line) + '\n')
+    return ''.join(lines)
+
+
+def generate_day11(size, seed=0):
+    """
+    Args:
+        size (int): number of starting stones
+
+        seed (int): random seed
+
+    Returns:
+        (str): stone numbers on a single line
+    """
+    rng = random.Random(seed)
+    stones = [rng.randint(0, 10 ** rng.randint(1, 7)) for _ in range(size)]
+    return ' '.join(map(str, stones)) + '\n'
+
+
+def generate_day12(size, seed=0, plot_area=40):
+    """
+    Args:
+        size (int): width and height of the farm
+
+        seed (int): random seed
+
+        plot_area (int): average number of tiles in each plot
+
+    Returns:
+        (str): farm map with each crop labelled by a capital letter
+    """
+    rng = random.Random(seed)
+    # nearest seed point regions give compact, irregular plots
+    bucket = int(math.sqrt(plot_area))
+    centres = {}
+    for row in range(0, size, bucket):
+        for col in range(0, size, bucket):
+            centres[(row // bucket, col // bucket)] = (
+                row + rng.randrange(bucket), col + rng.randrange(bucket),
+                chr(ord('A') + rng.randrange(26)))
+    lines = []
+    for row in range(size):
+        line = []
+        for col in range(size):
+            best = None
+            for row_adder in (-1, 0, 1):
+                for col_adder in (-1, 0, 1):
+                    centre = centres.get((row // bucket + row_adder,
+                                          col // bucket + col_adder))
+                    if centre is None:
+                        continue
+                    distance = (centre[0] - row) ** 2 + (centre[1] - col) ** 2
+                    if best is None or distance < best[0]:
+                        best = (distance, centre[2])
+            line.append(best[1])
+        lines.append(''.join(line) + '\n')
+    return ''.join(lines)
+
+
+def generate_day13(size, seed=0):
+    """
+    Args:
+        size (int): number of claw machines
+
+        seed (int): random seed
+
+    Returns:
+        (str): claw machine button behaviour and prize locations
+    """
+    rng = random.Random(seed)
+    machines = []
+    for _ in range(size):
+        a = (rng.randint(10, 99), rng.randint(10, 99))
+        b = (rng.randint(10, 99), rng.randint(10, 99))
+        if rng.random() < 0.5:
+            a_presses = rng.randint(1, 100)
+            b_presses = rng.randint(1, 100)
+            prize = (a[0] * a_presses + b[0] * b_presses,
+                     a[1] * a_presses + b[1] * b_presses)
+        else:
+            prize = (rng.randint(1000, 20000), rng.randint(1000, 20000))
+        machines.append(f"Button A: X+{a[0]}, Y+{a[1]}\n"
+                        f"Button B: X+{b[0]}, Y+{b[1]}\n"
+                        f"Prize: X={prize[0]}, Y={prize[1]}\n")
+    return '\n'.join(machines)
+
+
+GENERATORS = {1: generate_day1, 2: generate_day2, 3: generate_day3,
+              4: generate_day4, 5: generate_day5, 6: generate_day6,
+              7: generate_day7, 8: generate_day8, 9: generate_day9,
+              10: generate_day10, 11: generate_day11, 12: generate_day12,
+              13: generate_day13}
+
+
+def generate(day, size, seed=0):
+    """
+    Generate a synthetic puzzle input for a day
+
+    Args:
+        day (int): day number
+
+        size (int): size of the input, see each generate_dayN for its meaning
+
+        seed (int): random seed
+
+    Returns:
+        (str): puzzle input text
+    """
+    if day not in GENERATORS:
+        raise ValueError(f'no generator for day {day}')
+    return GENERATORS[day](size, seed)
+
+
+def write_input(file_name, day, size, seed=0):
+    """
+    Generate a synthetic puzzle input and write it to a file
+
+    Args:
+        file_name (str): file to write
+
+        day (int): day number
+
+        size (int): size of the input
+
+        seed (int): random seed
+
+    Returns:
+        file_name (str): the written file
+    """
+    with open(file_name, 'w') as file:
+        file.write(generate(day, size, seed))
+    return file_name
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--day', type=int, required=True, help='day number')
+    parser.add_argument('--size', type=int, required=True,
+                        help='input size, meaning depends on the day')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--output', default=None,
+                        help='file to write (default stdout)')
+    args = parser.parse_args(argv)
+
+    if args.output is None:
+        sys.stdout.write(generate(args.day, args.size, args.seed))
+    else:
+        write_input(args.output, args.day, args.size, args.seed)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+A 2d character grid stored in one flat bytearray
+"""
+__author__ = "Conner Beard"
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for Grid.to_numpy
+    np = None
+
+
+class Grid():
+    """
+    A 2d grid of single byte characters held in one flat bytearray.
+
+    The grid is surrounded by pad_width rows and columns of padding cells so
+    neighbour lookups up to pad_width steps away never leave the buffer, a
+    neighbour that is off the map simply reads as pad_value. Cells are
+    addressed either by (row, col) or by their flat index into cells, moving
+    to a neighbour is adding one of the precomputed offsets to a flat index.
+    """
+
+    def __init__(self, rows, pad_width=1, pad_value=0):
+        """
+        Args:
+            rows (list of str): grid rows, all the same length
+
+            pad_width (int): number of padding cells around the grid
+
+            pad_value (int): byte value stored in the padding cells
+
+        Raises:
+            ValueError: if the rows are not all the same length
+        """
+        self.height = len(rows)
+        self.width = len(rows[0]) if rows else 0
+        self.pad_width = pad_width
+        self.pad_value = pad_value
+        self.stride = self.width + 2 * pad_width
+        self.cells = bytearray([pad_value]) * (self.stride *
+                                               (self.height + 2 * pad_width))
+        for row_num, row in enumerate(rows):
+            if isinstance(row, str):
+                row = row.encode()
+            if len(row) != self.width:
+                # a slice assignment of the wrong length would resize cells
+                raise ValueError(f'grid row {row_num} has {len(row)} cells, '
+                                 f'expected {self.width}')
+            start = self.index(row_num, 0)
+            self.cells[start:start + self.width] = row
+
+        # up, right, down, left, the order a guard turns in
+        self.orthogonal_offsets = (-self.stride, 1, self.stride, -1)
+        # up-left, up-right, down-right, down-left
+        self.diagonal_offsets = (-self.stride - 1, -self.stride + 1,
+                                 self.stride + 1, self.stride - 1)
+        self.neighbour_offsets = self.orthogonal_offsets + self.diagonal_offsets
+
+    @classmethod
+    def from_file(cls, file_name, pad_width=1, pad_value=0):
+        """
+        Read a grid from a text file with one row per line, blank lines at
+        the end of the file are ignored
+
+        Args:
+            file_name (ascii text file): puzzle input
+
+            pad_width (int): number of padding cells around the grid
+
+            pad_value (int): byte value stored in the padding cells
+
+        Returns:
+            (Grid): the grid
+        """
+        with open(file_name, 'rb') as file:
+            rows = file.read().splitlines()
+        while rows and not rows[-1]:
+            rows.pop()
+        return cls(rows, pad_width, pad_value)
+
+    def index(self, row, col):
+        """
+        Args:
+            row (int): grid row
+
+            col (int): grid col
+
+        Returns:
+            (int): flat index of (row, col) into cells
+        """
+        return (row + self.pad_width) * self.stride + col + self.pad_width
+
+    def position(self, index):
+        """
+        Args:
+            index (int): flat index into cells
+
+        Returns:
+            (int, int): the (row, col) of the flat index
+        """
+        row, col = divmod(index, self.stride)
+        return row - self.pad_width, col - self.pad_width
+
+    def in_bounds(self, row, col):
+        """
+        Args:
+            row (int): grid row
+
+            col (int): grid col
+
+        Returns:
+            (bool): True if (row, col) is inside the grid (not padding)
+        """
+        return (0 <= row < self.height) and (0 <= col < self.width)
+
+    def indices(self):
+        """
+        Yields:
+            (int): flat index of every cell inside the grid, row by row
+        """
+        for row in range(self.height):
+            start = self.index(row, 0)
+            yield from range(start, start + self.width)
+
+    def find(self, value):
+        """
+        Args:
+            value (str): single character to search for
+
+        Returns:
+            (list of int): flat indices of every cell holding value
+        """
+        target = ord(value)
+        found = []
+        index = self.cells.find(target)
+        while index != -1:
+            found.append(index)
+            index = self.cells.find(target, index + 1)
+        return found
+
+    def row(self, row):
+        """
+        Args:
+            row (int): grid row
+
+        Returns:
+            (str): the row as a string
+        """
+        start = self.index(row, 0)
+        return self.cells[start:start + self.width].decode()
+
+    def copy(self):
+        """
+        Returns:
+            (Grid): an independent copy of the grid
+        """
+        grid = Grid.__new__(Grid)
+        grid.__dict__.update(self.__dict__)
+        grid.cells = bytearray(self.cells)
+        return grid
+
+    def to_numpy(self, padded=False):
+        """
+        View the grid as a 2d numpy uint8 array, the view shares memory with
+        cells so no data is copied
+
+        Args:
+            padded (bool): include the padding cells in the view
+
+        Returns:
+            (numpy array): array of shape (height, width) or the padded shape
+        """
+        if np is None:
+            raise ImportError('Grid.to_numpy requires numpy')
+        array = np.frombuffer(self.cells, dtype=np.uint8).reshape(
+            self.height + 2 * self.pad_width, self.stride)
+        if padded:
+            return array
+        pad = self.pad_width
+        return array[pad:pad + self.height, pad:pad + self.width]
+
+    def __getitem__(self, position):
+        return chr(self.cells[self.index(*position)])
+
+    def __setitem__(self, position, value):
+        self.cells[self.index(*position)] = ord(value)
+
+    def __str__(self):
+        return '\n'.join(self.row(row) for row in range(self.height))
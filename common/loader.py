@@ -0,0 +1,252 @@
+"""
+Memory mapped puzzle input loading with integer parsing straight from the
+mapped file buffer
+"""
+__author__ = "Conner Beard"
+
+import mmap
+import os
+import re
+
+try:
+    import numpy as np
+except ImportError:  # fall back to regex parsing without numpy
+    np = None
+
+NEWLINE = ord('\n')
+MINUS = ord('-')
+# numbers with more digits than this may not fit in an int64
+MAX_INT64_DIGITS = 18
+# bytes parsed per numpy pass, bounds the temporary arrays on huge inputs
+CHUNK_SIZE = 1 << 24
+
+# a minus sign directly before the digits makes the number negative
+_number_pattern = re.compile(rb'-?\d+')
+
+
+class MappedInput():
+    """
+    A read only memory map of a puzzle input file.
+
+    Lines are located by their byte offsets and handed out as memoryview
+    slices of the map, so nothing is copied until a caller asks for it. Use
+    as a context manager so the map is closed once parsing is finished, any
+    memoryview handed out must be released before then.
+    """
+
+    def __init__(self, file_name):
+        """
+        Args:
+            file_name (ascii text file): puzzle input
+        """
+        self._file = open(file_name, 'rb')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            # an empty file can not be memory mapped
+            self._map = None
+            self.buffer = memoryview(b'')
+        else:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+            self.buffer = memoryview(self._map)
+        self._line_offsets = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Release the buffer and close the map and file
+        """
+        self.buffer.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    @property
+    def line_offsets(self):
+        """
+        Returns:
+            (list of int): byte offset of the start of every line plus a final
+            entry one past the end of the last line's newline
+        """
+        if self._line_offsets is None:
+            if np is not None:
+                data = np.frombuffer(self.buffer, dtype=np.uint8)
+                ends = (np.flatnonzero(data == NEWLINE) + 1).tolist()
+                del data
+            else:
+                ends = [match.end() for match in
+                        re.finditer(rb'\n', self.buffer)]
+            offsets = [0] + ends
+            if offsets[-1] != len(self.buffer):
+                # last line has no trailing newline
+                offsets.append(len(self.buffer))
+            self._line_offsets = offsets
+        return self._line_offsets
+
+    def __len__(self):
+        return len(self.line_offsets) - 1
+
+    def line(self, number):
+        """
+        Args:
+            number (int): line number
+
+        Returns:
+            (memoryview): the line without its newline, no data is copied
+        """
+        start = self.line_offsets[number]
+        end = self.line_offsets[number + 1]
+        if end > start and self.buffer[end - 1] == NEWLINE:
+            end = end - 1
+        return self.buffer[start:end]
+
+    def ints(self, as_list=False):
+        """
+        Parse every integer in the file
+
+        Args:
+            as_list (bool): return a list of python ints instead of an array
+
+        Returns:
+            values (numpy int64 array or list of int): integers in file order,
+            a list is returned without numpy or if a number could overflow
+            64 bits
+        """
+        values, _ = self._parse(with_lines=False)
+        if as_list and not isinstance(values, list):
+            values = values.tolist()
+        return values
+
+    def line_ints(self):
+        """
+        Parse every integer in the file along with how many integers each
+        line holds
+
+        Returns:
+            values (numpy int64 array or list of int): integers in file order
+
+            counts (numpy int64 array or list of int): number of integers on
+            each line, blank lines count zero
+        """
+        return self._parse(with_lines=True)
+
+    def int_rows(self):
+        """
+        Returns:
+            rows (list of list of int): the integers on each line, blank lines
+            give an empty list
+        """
+        values, counts = self.line_ints()
+        if not isinstance(values, list):
+            values = values.tolist()
+            counts = counts.tolist()
+        rows = []
+        start = 0
+        for count in counts:
+            rows.append(values[start:start + count])
+            start = start + count
+        return rows
+
+    def _parse(self, with_lines):
+        if np is not None:
+            try:
+                return self._parse_numpy(with_lines)
+            except OverflowError:
+                pass
+        return self._parse_regex(with_lines)
+
+    def _parse_regex(self, with_lines):
+        if not with_lines:
+            return [int(match.group())
+                    for match in _number_pattern.finditer(self.buffer)], None
+        values = []
+        counts = []
+        offsets = self.line_offsets
+        for number in range(len(offsets) - 1):
+            row = [int(match.group()) for match in _number_pattern.finditer(
+                self.buffer, offsets[number], offsets[number + 1])]
+            values.extend(row)
+            counts.append(len(row))
+        return values, counts
+
+    def _parse_numpy(self, with_lines):
+        data = np.frombuffer(self.buffer, dtype=np.uint8)
+        value_chunks = []
+        line_chunks = []
+        lines_before = 0
+        start = 0
+        try:
+            while start < len(data):
+                # chunks end on a newline so no number is split in two
+                end = min(start + CHUNK_SIZE, len(data))
+                if end < len(data):
+                    newline = self._map.rfind(b'\n', start, end)
+                    if newline == -1:
+                        # a single line longer than a chunk
+                        newline = self._map.find(b'\n', end)
+                    end = len(data) if newline == -1 else newline + 1
+                chunk = data[start:end]
+                values, starts = _chunk_ints(chunk)
+                value_chunks.append(values)
+                if with_lines:
+                    # line number of every number, from the newlines before it
+                    newlines = np.flatnonzero(chunk == NEWLINE)
+                    line_chunks.append(np.searchsorted(newlines, starts) +
+                                       lines_before)
+                    lines_before = lines_before + len(newlines)
+                start = end
+        finally:
+            del data
+        if value_chunks:
+            values = np.concatenate(value_chunks)
+        else:
+            values = np.zeros(0, dtype=np.int64)
+        if not with_lines:
+            return values, None
+        if line_chunks:
+            number_lines = np.concatenate(line_chunks)
+        else:
+            number_lines = np.zeros(0, dtype=np.int64)
+        counts = np.bincount(number_lines, minlength=len(self))
+        return values, counts.astype(np.int64)
+
+
+def _chunk_ints(chunk):
+    """
+    Parse the digit runs of a uint8 buffer into int64 values without
+    creating any intermediate strings, also returns the offset each number
+    starts at. A digit run directly after a minus sign is negative.
+    """
+    # non digit bytes wrap around to values above 9
+    digits = chunk - ord('0')
+    is_digit = digits < 10
+    edges = np.flatnonzero(is_digit[1:] != is_digit[:-1]) + 1
+    if len(chunk) and is_digit[0]:
+        edges = np.concatenate(([0], edges))
+    if len(chunk) and is_digit[-1]:
+        edges = np.concatenate((edges, [len(chunk)]))
+    starts = edges[0::2]
+    lengths = edges[1::2] - starts
+    values = np.zeros(len(starts), dtype=np.int64)
+    if len(starts) == 0:
+        return values, starts
+    shortest = lengths.min()
+    longest = lengths.max()
+    if longest > MAX_INT64_DIGITS:
+        raise OverflowError('number too large for int64')
+    # horner's rule one digit place at a time across every number at once
+    for place in range(longest):
+        if place < shortest:
+            values = values * 10 + digits[starts + place]
+        else:
+            active = np.flatnonzero(lengths > place)
+            values[active] = values[active] * 10 + \
+                digits[starts[active] + place]
+    signed = starts[starts > 0]
+    negative = signed[chunk[signed - 1] == MINUS]
+    values[np.searchsorted(starts, negative)] *= -1
+    return values, starts
@@ -0,0 +1,177 @@
+"""
+Opt-in per function profiling for the hot paths of the solvers
+
+Decorate a function with profile and, when the AOC_PROFILE environment
+variable is set before the day is imported, every call records its call
+count, cumulative time and peak traced memory:
+    AOC_PROFILE=1      time and memory (memory tracing slows the run down)
+    AOC_PROFILE=time   time only
+When the process exits a per day summary table is printed to stderr, and
+if AOC_PROFILE_OUTPUT names a file, flamegraph compatible collapsed stacks
+are written to it. With profiling off the decorator returns the function
+untouched, so there is no overhead.
+"""
+__author__ = "Conner Beard"
+
+import atexit
+import functools
+import inspect
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+
+class FunctionStats():
+    """
+    Running totals for one profiled function
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.peak_bytes = 0
+
+
+_stats = defaultdict(FunctionStats)
+# collapsed stack ("a;b;c") mapped to the time spent in c itself
+_collapsed = defaultdict(int)
+# one entry per active profiled call:
+# [name, start_ns, child_ns, entry_bytes, peak_bytes]
+_stack = []
+_active = defaultdict(int)
+_reporting = False
+
+
+def _mode():
+    return os.environ.get('AOC_PROFILE', '0')
+
+
+def profile(func):
+    """
+    Decorator recording call statistics for func when profiling is enabled
+
+    Args:
+        func (callable): function to profile
+
+    Returns:
+        (callable): func itself when profiling is off, otherwise a wrapper
+    """
+    mode = _mode()
+    if mode in ('', '0'):
+        return func
+    trace_memory = mode != 'time'
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _register_report()
+
+    # name functions by their day directory, scripts all run as __main__
+    code_file = inspect.unwrap(func).__code__.co_filename
+    day = os.path.basename(os.path.dirname(code_file))
+    name = f'{day}.{func.__qualname__}'
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if _stack:
+                # keep the caller's peak before resetting it for this call
+                _stack[-1][4] = max(_stack[-1][4], peak)
+            tracemalloc.reset_peak()
+        else:
+            current = 0
+        frame = [name, time.perf_counter_ns(), 0, current, current]
+        _stack.append(frame)
+        _active[name] = _active[name] + 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter_ns() - frame[1]
+            if trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], frame[4])
+            else:
+                peak = 0
+            _active[name] = _active[name] - 1
+            path = _stack_path()
+            _stack.pop()
+
+            stats = _stats[name]
+            stats.calls = stats.calls + 1
+            if _active[name] == 0:
+                # only the outermost call of a recursion adds its time
+                stats.total_ns = stats.total_ns + elapsed
+            stats.peak_bytes = max(stats.peak_bytes, peak - frame[3])
+            _collapsed[path] = _collapsed[path] + elapsed - frame[2]
+            if _stack:
+                _stack[-1][2] = _stack[-1][2] + elapsed
+                _stack[-1][4] = max(_stack[-1][4], peak)
+    return wrapper
+
+
+def _stack_path():
+    # recursive calls are merged into one frame to keep the stacks readable
+    names = []
+    for frame in _stack:
+        if not names or names[-1] != frame[0]:
+            names.append(frame[0])
+    return ';'.join(names)
+
+
+def reset():
+    """
+    Discard all recorded statistics
+    """
+    _stats.clear()
+    _collapsed.clear()
+
+
+def summary_table():
+    """
+    Returns:
+        (str): a fixed width table of the recorded statistics grouped by day
+    """
+    lines = [f"{'function':<32} {'calls':>10} {'total ms':>12} "
+             f"{'us/call':>10} {'peak KB':>10}"]
+    for name, stats in sorted(_stats.items(),
+                              key=lambda item: (_day_number(item[0]),
+                                                -item[1].total_ns)):
+        per_call = stats.total_ns / stats.calls / 1e3 if stats.calls else 0
+        lines.append(f"{name:<32} {stats.calls:>10} "
+                     f"{stats.total_ns / 1e6:>12.3f} {per_call:>10.3f} "
+                     f"{stats.peak_bytes / 1e3:>10.1f}")
+    return '\n'.join(lines)
+
+
+def _day_number(name):
+    digits = ''.join(char for char in name.split('.')[0] if char.isdigit())
+    return int(digits) if digits else 0
+
+
+def write_collapsed(file_name):
+    """
+    Write the recorded stacks in the collapsed format read by flamegraph.pl
+    and speedscope, one "frame;frame;frame microseconds" line per stack
+
+    Args:
+        file_name (str): file to write
+    """
+    with open(file_name, 'w') as file:
+        for path, self_ns in sorted(_collapsed.items()):
+            file.write(f"{path} {max(self_ns // 1000, 0)}\n")
+
+
+def _register_report():
+    global _reporting
+    if not _reporting:
+        atexit.register(_report)
+        _reporting = True
+
+
+def _report():
+    if not _stats:
+        return
+    print(summary_table(), file=sys.stderr)
+    output = os.environ.get('AOC_PROFILE_OUTPUT')
+    if output:
+        write_collapsed(output)
@@ -0,0 +1,132 @@
+"""
+Opt-in progress reporting for long running solvers
+
+Create a Progress around a solver's main loop and call update() as work is
+done. Nothing is reported unless the AOC_PROGRESS environment variable is
+set (to anything but 0) or a callback is given, and reports are throttled
+by time, so leaving the updates in a hot loop costs next to nothing:
+    AOC_PROGRESS=1    report to stderr at most once per interval
+"""
+__author__ = "Conner Beard"
+
+import os
+import sys
+import time
+
+
+def _enabled():
+    return os.environ.get('AOC_PROGRESS', '0') not in ('', '0')
+
+
+class Progress():
+    """
+    Counts completed units of work and reports how far along a solver is and
+    how fast it is going, the count, fraction done and rate in units per
+    second
+    """
+
+    def __init__(self, total=None, label='progress', interval=1.0,
+                 stream=None, callback=None):
+        """
+        Args:
+            total (int): units of work expected, None if unknown
+
+            label (str): name shown in front of every report
+
+            interval (float): minimum seconds between reports
+
+            stream (file): where reports are written, defaults to stderr
+
+            callback (callable): called as callback(progress) instead of
+            writing a report, giving a callback turns reporting on
+        """
+        self.total = total
+        self.label = label
+        self.interval = interval
+        self.stream = stream
+        self.callback = callback
+        self.enabled = callback is not None or _enabled()
+        self.count = 0
+        self.start = time.perf_counter()
+        self._next_report = self.start + interval
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def elapsed(self):
+        """
+        Returns:
+            (float): seconds since the progress was created
+        """
+        return time.perf_counter() - self.start
+
+    @property
+    def rate(self):
+        """
+        Returns:
+            (float): units of work completed per second
+        """
+        elapsed = self.elapsed
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def fraction(self):
+        """
+        Returns:
+            (float): fraction of total completed, None if total is unknown,
+            an empty total counts as done
+        """
+        if self.total is None:
+            return None
+        if self.total == 0:
+            return 1.0
+        return self.count / self.total
+
+    def update(self, count=1):
+        """
+        Record completed work, a report is made if reporting is on and the
+        interval has passed since the last one
+
+        Args:
+            count (int): units of work completed since the last update
+        """
+        self.count = self.count + count
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if now >= self._next_report:
+            self._next_report = now + self.interval
+            self.report()
+
+    def report(self):
+        """
+        Report the current progress to the callback or stream
+        """
+        if self.callback is not None:
+            self.callback(self)
+            return
+        stream = self.stream if self.stream is not None else sys.stderr
+        print(self.format(), file=stream, flush=True)
+
+    def format(self):
+        """
+        Returns:
+            (str): one line summary such as
+            "label: 50/200 (25.0%) 1234.5/s 0.0s"
+        """
+        if self.fraction is None:
+            done = f'{self.count}'
+        else:
+            done = f'{self.count}/{self.total} ({100 * self.fraction:.1f}%)'
+        return f'{self.label}: {done} {self.rate:.1f}/s {self.elapsed:.1f}s'
+
+    def close(self):
+        """
+        Make a final report if reporting is on
+        """
+        if self.enabled:
+            self.report()
@@ -0,0 +1,244 @@
+"""
+Run the advent of code solvers for many days in a single python process
+
+usage (from the repository root):
+    python3 -m common.runner --days 1-13 --parts 1,2 --jobs 4
+"""
+__author__ = "Conner Beard"
+
+import argparse
+import importlib.util
+import inspect
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from common.generators import write_input
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_loaded_days = {}
+
+
+def find_days(root=REPO_ROOT):
+    """
+    Find every dayN/main.py solver in the repository
+
+    Args:
+        root (str): repository root to search in
+
+    Returns:
+        days (dict of int: str): day number mapped to the path of its main.py
+    """
+    days = {}
+    for entry in os.listdir(root):
+        match = re.fullmatch(r'day(\d+)', entry)
+        if match is None:
+            continue
+        path = os.path.join(root, entry, 'main.py')
+        if os.path.isfile(path):
+            days[int(match.group(1))] = path
+    return dict(sorted(days.items()))
+
+
+def load_day(day, root=REPO_ROOT):
+    """
+    Import the solver module for a day, each day is only imported once per
+    process
+
+    Args:
+        day (int): day number
+
+        root (str): repository root to search in
+
+    Returns:
+        the imported dayN/main.py module
+    """
+    if day in _loaded_days:
+        return _loaded_days[day]
+    path = find_days(root)[day]
+    spec = importlib.util.spec_from_file_location(f'day{day}_main', path)
+    module = importlib.util.module_from_spec(spec)
+    # registered so pool workers can unpickle the day's functions
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    _loaded_days[day] = module
+    return module
+
+
+def parse_selection(text):
+    """
+    Convert a selection string such as "1-3,5,7-8" into a list of ints
+
+    Args:
+        text (str): comma seperated numbers and inclusive ranges
+
+    Returns:
+        (list of int): the selected numbers in the order given
+    """
+    selection = []
+    for item in text.split(','):
+        item = item.strip()
+        if item == '':
+            continue
+        if '-' in item:
+            first, last = map(int, item.split('-'))
+            selection.extend(range(first, last + 1))
+        else:
+            selection.append(int(item))
+    return selection
+
+
+def run_day(day, parts=(1, 2), input_name='input.txt', root=REPO_ROOT,
+            size=None, seed=0, jobs=1):
+    """
+    Solve the requested parts of a single day
+
+    Args:
+        day (int): day number
+
+        parts (list of int): puzzle parts to solve
+
+        input_name (str): name of the input file inside the day directory
+
+        root (str): repository root to search in
+
+        size (int): if given, solve a generated input of this size instead of
+        input_name
+
+        seed (int): random seed for the generated input
+
+        jobs (int): worker processes handed to solvers that take a jobs
+        argument
+
+    Returns:
+        results (list of (day, part, solution, seconds))
+    """
+    if size is not None:
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = write_input(os.path.join(directory, 'input.txt'),
+                                    day, size, seed)
+            return run_day(day, parts, file_name, root, jobs=jobs)
+
+    module = load_day(day, root)
+    file_name = os.path.join(os.path.dirname(module.__file__), input_name)
+    results = []
+    for part in parts:
+        solver = getattr(module, f'solve_part_{part}', None)
+        if solver is None:
+            continue
+        kwargs = {}
+        if jobs > 1 and 'jobs' in inspect.signature(solver).parameters:
+            kwargs['jobs'] = jobs
+        start = time.perf_counter()
+        solution = solver(file_name, **kwargs)
+        results.append((day, part, solution, time.perf_counter() - start))
+    return results
+
+
+def run_days(days, parts=(1, 2), input_name='input.txt', jobs=1,
+             root=REPO_ROOT, size=None, seed=0):
+    """
+    Solve the requested parts for each day, optionally spreading days across
+    a process pool
+
+    Args:
+        days (list of int): day numbers to run
+
+        parts (list of int): puzzle parts to solve
+
+        input_name (str): name of the input file inside each day directory
+
+        jobs (int): number of worker processes, 1 runs everything in process.
+        With a single day the workers go to the day's solvers instead
+
+        root (str): repository root to search in
+
+        size (int): if given, solve generated inputs of this size
+
+        seed (int): random seed for the generated inputs
+
+    Returns:
+        results (list of (day, part, solution, seconds)) in day order
+    """
+    if jobs <= 1 or len(days) <= 1:
+        results = []
+        for day in days:
+            results.extend(run_day(day, parts, input_name, root, size, seed,
+                                   jobs))
+        return results
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(run_day, day, parts, input_name, root,
+                                   size, seed)
+                   for day in days]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--days', default=None,
+                        help='days to run, e.g. "1-13" or "1,4,6" (default all)')
+    parser.add_argument('--parts', default='1,2',
+                        help='parts to run, e.g. "1,2" (default 1,2)')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='number of worker processes (default 1)')
+    parser.add_argument('--input', default='input.txt',
+                        help='input file name inside each day directory')
+    parser.add_argument('--size', type=int, default=None,
+                        help='solve generated inputs of this size instead')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed for generated inputs (default 0)')
+    parser.add_argument('--parse-cache', choices=['off', 'memory', 'disk'],
+                        default=None,
+                        help='parsed input cache mode (default memory)')
+    parser.add_argument('--profile', choices=['time', 'memory'],
+                        default=None,
+                        help='profile the instrumented hot functions, '
+                        'forces --jobs 1')
+    parser.add_argument('--profile-output', default=None,
+                        help='write collapsed flamegraph stacks to this file')
+    parser.add_argument('--progress', action='store_true',
+                        help='report the progress of long solvers to stderr')
+    args = parser.parse_args(argv)
+
+    if args.profile is not None:
+        # must be set before the days are imported and decorated
+        os.environ['AOC_PROFILE'] = '1' if args.profile == 'memory' else 'time'
+        if args.profile_output is not None:
+            os.environ['AOC_PROFILE_OUTPUT'] = args.profile_output
+        args.jobs = 1
+    if args.progress:
+        # read when each solver starts, pool workers inherit it
+        os.environ['AOC_PROGRESS'] = '1'
+    if args.parse_cache is not None:
+        # set before any day runs so pool workers inherit it
+        os.environ['AOC_PARSE_CACHE'] = args.parse_cache
+
+    available = find_days()
+    if args.days is None:
+        days = list(available)
+    else:
+        days = parse_selection(args.days)
+    missing = [day for day in days if day not in available]
+    if missing:
+        parser.error(f'no solver found for day(s) {missing}')
+    parts = parse_selection(args.parts)
+
+    start = time.perf_counter()
+    results = run_days(days, parts, args.input, args.jobs,
+                       size=args.size, seed=args.seed)
+    for day, part, solution, seconds in results:
+        print(f"Day {day} part {part} solution: {solution}, time:{seconds}")
+    print(f"Total time:{time.perf_counter() - start}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,9 +4,33 @@ https://adventofcode.com/2024/day/1
 """
 __author__ = "Conner Beard"
 
+import heapq
 import os
-
-
+import sys
+import tempfile
+from array import array
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import cached_parse  # noqa: E402
+from common.loader import MappedInput  # noqa: E402
+
+try:
+    import numpy as np
+except ImportError:  # the 'array' mode needs numpy
+    np = None
+
+DEFAULT_MODE = 'list' if np is None else 'array'
+# the loader DEFAULT_MODE parses with, timed by common.benchmark
+DEFAULT_LOADER = 'load_location_lists' if np is None else 'load_location_arrays'
+# bytes of input read per chunk in 'stream' mode
+STREAM_CHUNK_SIZE = 1 << 24
+# most run files merged at once in 'stream' mode, both lists are merged
+# together so twice as many files are open at a time
+MERGE_FAN_IN = 64
+
+
+@cached_parse
 def load_location_lists(file_name):
     """
     Read in the puzzle input file and extract the two location ID lists.
@@ -19,15 +43,205 @@ def load_location_lists(file_name):
         list_a (list of int): first location list
         list_b (list of int): second location list
     """
-    list_a = []
-    list_b = []
-    with open(file_name, 'r') as file:
-        for element1, element2 in [x.split() for x in file.readlines()]:
-            list_a.append(int(element1))
-            list_b.append(int(element2))
+    with MappedInput(file_name) as puzzle:
+        values = puzzle.ints(as_list=True)
+    list_a = values[0::2]
+    list_b = values[1::2]
     return list_a, list_b
 
 
+@cached_parse
+def load_location_arrays(file_name):
+    """
+    Read in the puzzle input file and extract the two location ID lists as
+    numpy arrays, the numbers are parsed straight from the file buffer.
+
+    Args:
+        file_name (ascii text file): puzzle input, two numbers per line
+        seperated by whitespace.
+
+    Returns:
+        array_a (numpy int64 array): first location list
+        array_b (numpy int64 array): second location list
+    """
+    with MappedInput(file_name) as puzzle:
+        values = np.asarray(puzzle.ints(), dtype=np.int64).reshape(-1, 2)
+    array_a = np.ascontiguousarray(values[:, 0])
+    array_b = np.ascontiguousarray(values[:, 1])
+    return array_a, array_b
+
+
+def iter_location_chunks(file_name, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Read the puzzle input a chunk of whole lines at a time so only one chunk
+    of the location lists is ever held in memory.
+
+    Args:
+        file_name (ascii text file): puzzle input, two numbers per line
+        seperated by whitespace.
+
+        chunk_size (int): approximate number of bytes read per chunk
+
+    Yields:
+        chunk_a (list of int): next part of the first location list
+        chunk_b (list of int): next part of the second location list
+    """
+    with open(file_name, 'rb') as file:
+        while True:
+            lines = file.readlines(chunk_size)
+            if not lines:
+                break
+            values = b' '.join(lines).split()
+            yield list(map(int, values[0::2])), list(map(int, values[1::2]))
+
+
+def write_sorted_run(values, directory):
+    """
+    Sort values and spill them to a temporary file as packed int64s
+
+    Args:
+        values (list of int): one chunk of a location list
+
+        directory (str): directory to create the run file in
+
+    Returns:
+        (str): path of the run file
+    """
+    values.sort()
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as file:
+        array('q', values).tofile(file)
+    return file.name
+
+
+def read_sorted_run(path, block=1 << 16):
+    """
+    Stream a run file written by write_sorted_run back in blocks
+
+    Args:
+        path (str): run file
+
+        block (int): number of values read at a time
+
+    Yields:
+        (int): the run's values in sorted order
+    """
+    with open(path, 'rb') as file:
+        while True:
+            values = array('q')
+            try:
+                values.fromfile(file, block)
+            except EOFError:
+                # the partial final block is still appended
+                yield from values
+                break
+            yield from values
+
+
+def merge_runs(runs, directory, fan_in=MERGE_FAN_IN, block=1 << 16):
+    """
+    Merge run files in passes of at most fan_in files at a time until no
+    more than fan_in runs are left, so the number of open files stays
+    bounded however large the input is. Merged runs are deleted.
+
+    Args:
+        runs (list of str): run files written by write_sorted_run
+
+        directory (str): directory to create the merged run files in
+
+        fan_in (int): most run files open at once
+
+        block (int): number of values written at a time
+
+    Returns:
+        (list of str): at most fan_in run files holding the same values
+    """
+    while len(runs) > fan_in:
+        merged_runs = []
+        for start in range(0, len(runs), fan_in):
+            group = runs[start:start + fan_in]
+            merged = heapq.merge(*[read_sorted_run(run) for run in group])
+            with tempfile.NamedTemporaryFile(dir=directory,
+                                             delete=False) as file:
+                values = array('q')
+                for value in merged:
+                    values.append(value)
+                    if len(values) == block:
+                        values.tofile(file)
+                        values = array('q')
+                values.tofile(file)
+            merged_runs.append(file.name)
+            for run in group:
+                os.remove(run)
+        runs = merged_runs
+    return runs
+
+
+def get_distance_stream(file_name, chunk_size=STREAM_CHUNK_SIZE,
+                        fan_in=MERGE_FAN_IN):
+    """
+    Out of core get_distance, an external merge sort spills each chunk of
+    both lists as a sorted run to disk then merges the runs back together
+    so memory use is bounded by the chunk size. Runs are merged in passes of
+    at most fan_in files, so the number of open files stays bounded too.
+
+    Args:
+        file_name (ascii text file): puzzle input, two numbers per line
+        seperated by whitespace.
+
+        chunk_size (int): approximate number of bytes read per chunk
+
+        fan_in (int): most run files of each list merged at once
+
+    Returns:
+        total_distance: summation of numerical distance between sorted list
+        elements
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        runs_a = []
+        runs_b = []
+        for chunk_a, chunk_b in iter_location_chunks(file_name, chunk_size):
+            assert len(chunk_a) == len(chunk_b)
+            runs_a.append(write_sorted_run(chunk_a, directory))
+            runs_b.append(write_sorted_run(chunk_b, directory))
+
+        runs_a = merge_runs(runs_a, directory, fan_in)
+        runs_b = merge_runs(runs_b, directory, fan_in)
+        sorted_a = heapq.merge(*[read_sorted_run(run) for run in runs_a])
+        sorted_b = heapq.merge(*[read_sorted_run(run) for run in runs_b])
+        total_distance = 0
+        for value_a, value_b in zip(sorted_a, sorted_b):
+            total_distance = total_distance + abs(value_a - value_b)
+
+    return total_distance
+
+
+def get_similarity_stream(file_name, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Out of core get_similarity, a first pass counts every value of list_b
+    and a second pass scores list_a chunk by chunk, memory use is bounded by
+    the chunk size and the number of distinct location IDs.
+
+    Args:
+        file_name (ascii text file): puzzle input, two numbers per line
+        seperated by whitespace.
+
+        chunk_size (int): approximate number of bytes read per chunk
+
+    Returns:
+        total_similarity: similarity score between list_a and list_b
+    """
+    counts = Counter()
+    for _, chunk_b in iter_location_chunks(file_name, chunk_size):
+        counts.update(chunk_b)
+
+    total_similarity = 0
+    for chunk_a, _ in iter_location_chunks(file_name, chunk_size):
+        for value in chunk_a:
+            total_similarity = total_similarity + value * counts[value]
+
+    return total_similarity
+
+
 def get_distance(list_a, list_b):
     """
     For two lists of the same length, get the numerical distance between each
@@ -77,7 +291,49 @@ def get_similarity(list_a, list_b):
     return total_similarity
 
 
-def solve_part_1(file_name):
+def get_distance_array(array_a, array_b):
+    """
+    Vectorised get_distance, sorts both arrays and sums the absolute
+    difference of each pair.
+
+    Args:
+        array_a (numpy int64 array): first location list
+        array_b (numpy int64 array): second location list
+
+    Returns:
+        total_distance: summation of numerical distance between sorted list
+        elements
+    """
+    assert len(array_a) == len(array_b)
+
+    return int(np.abs(np.sort(array_a) - np.sort(array_b)).sum())
+
+
+def get_similarity_array(array_a, array_b):
+    """
+    Vectorised get_similarity, counts every value in array_b once with
+    np.unique then looks each element of array_a up in the sorted counts.
+
+    Args:
+        array_a (numpy int64 array): first location list
+        array_b (numpy int64 array): second location list
+
+    Returns:
+        total_similarity: similarity score between array_a and array_b
+    """
+    assert len(array_a) == len(array_b)
+
+    values, counts = np.unique(array_b, return_counts=True)
+    if len(values) == 0:
+        return 0
+    positions = np.searchsorted(values, array_a)
+    positions = np.minimum(positions, len(values) - 1)
+    found = values[positions] == array_a
+
+    return int((array_a[found] * counts[positions[found]]).sum())
+
+
+def solve_part_1(file_name, mode=DEFAULT_MODE):
     """
     Get the total "distance" between the two lists from day 1.
 
@@ -85,9 +341,17 @@ def solve_part_1(file_name):
         file_name (ascii text file): puzzle input, two numbers per line
         seperated by whitespace.
 
+        mode ('list', 'array' or 'stream'): solve with python lists, numpy
+        arrays or out of core with bounded memory
+
     Returns:
         total_distance: summation of numerical distance between list elements
     """
+    if mode == 'array':
+        return get_distance_array(*load_location_arrays(file_name))
+    elif mode == 'stream':
+        return get_distance_stream(file_name)
+
     list_a, list_b = load_location_lists(file_name)
     for location_list in [list_a, list_b]:
         location_list.sort()
@@ -96,7 +360,7 @@ def solve_part_1(file_name):
     return total_distance
 
 
-def solve_part_2(file_name):
+def solve_part_2(file_name, mode=DEFAULT_MODE):
     """
     Get the total "similarity" between the two lists from day 1.
 
@@ -104,9 +368,17 @@ def solve_part_2(file_name):
         file_name (ascii text file): puzzle input, two numbers per line
         seperated by whitespace.
 
+        mode ('list', 'array' or 'stream'): solve with python lists, numpy
+        arrays or out of core with bounded memory
+
     Returns:
         total_similarity: similarity score between list_a and list_b
     """
+    if mode == 'array':
+        return get_similarity_array(*load_location_arrays(file_name))
+    elif mode == 'stream':
+        return get_similarity_stream(file_name)
+
     list_a, list_b = load_location_lists(file_name)
     total_similarity = get_similarity(list_a, list_b)
 
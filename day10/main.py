@@ -5,9 +5,17 @@ https://adventofcode.com/2024/day/10
 __author__ = "Conner Beard"
 
 import os
+import sys
 import time
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import cached_parse  # noqa: E402
+from common.grid import Grid  # noqa: E402
 
+PEAK = ord('9')
+
+
+@cached_parse
 def load_puzzle_input(file_name):
     """
 
@@ -15,72 +23,44 @@ def load_puzzle_input(file_name):
         file_name (ascii text file): puzzle input
 
     Returns:
-        puzzle input
-    """
-    array = []
-    with open(file_name, 'r') as file:
-        for line in file.readlines():
-            row = []
-            for value in line[:-1]:
-                row.append(int(value))
-            array.append(row)
-    return array
-
-
-def check_bounds(row, col, array):
-    """
-    check if array indexing is within the bounds of the array
-    Args:
-        row (int): array row
-        col (int): array col
-        array (list of lists): array to check bounds on
-    Returns:
-        (bool): True if in bounds, False if out of bounds
+        grid (Grid): map of ascii heights '0' to '9', padding is never a
+        valid next step on a trail
     """
-    if (row < 0) | (col < 0):
-        return False
-    if row > (len(array) - 1):
-        return False
-    if col > (len(array[0]) - 1):
-        return False
-    return True
+    return Grid.from_file(file_name)
 
 
-def follow_trail(start_row, start_col, array, depth=0):
+def follow_trail(start, grid, depth=0):
     """
     Recursive function to follow trails to their endponints and add each
     unique endpoint to a set.
     Args:
-        start_row (int): array row of current trail tile
+        start (int): flat grid index of current trail tile
 
-        start_col (int): array col of current trail tile
-
-        array (list of list of int): map representation
+        grid (Grid): map representation
 
         depth (int): recursion depth
     Returns:
-        a set of valid trail endpoints for the top level recursion call
+        a set of valid trail endpoints (flat grid indices) for the top level
+        recursion call and the number of distinct paths to them
     """
     if depth > 11:
         raise RecursionError('Trail overflow')
 
-    assert array[start_row][start_col] != 9
-
-    directions = {'up': (start_row - 1, start_col),
-                  'down': (start_row + 1, start_col),
-                  'left': (start_row, start_col - 1),
-                  'right': (start_row, start_col + 1)}
+    cells = grid.cells
+    next_height = cells[start] + 1
+    assert next_height <= PEAK
 
     found_ends = set()
     found_paths = 0
-    for row, col in directions.values():
-        if check_bounds(row, col, array) is False:
+    for offset in grid.orthogonal_offsets:
+        neighbour = start + offset
+        if cells[neighbour] != next_height:
             continue
-        if (array[row][col] == 9) & (array[start_row][start_col] == 8):
-            found_ends.add((row, col))
+        if next_height == PEAK:
+            found_ends.add(neighbour)
             found_paths = found_paths + 1
-        elif array[row][col] == array[start_row][start_col] + 1:
-            ends, paths = follow_trail(row, col, array, depth + 1)
+        else:
+            ends, paths = follow_trail(neighbour, grid, depth + 1)
             found_ends = found_ends.union(ends)
             found_paths = found_paths + paths
     return found_ends, found_paths
@@ -94,14 +74,12 @@ def solve_part_1(file_name):
     Returns:
         the number of unique endpoints reachable from trailheads
     """
-    array = load_puzzle_input(file_name)
+    grid = load_puzzle_input(file_name)
     total_score = 0
-    for row_num, row in enumerate(array):
-        for col_num, value in enumerate(row):
-            if value == 0:
-                ends, paths = follow_trail(row_num, col_num, array)
-                score = len(ends)
-                total_score = total_score + score
+    for trailhead in grid.find('0'):
+        ends, paths = follow_trail(trailhead, grid)
+        score = len(ends)
+        total_score = total_score + score
     return total_score
 
 
@@ -113,14 +91,12 @@ def solve_part_2(file_name):
     Returns:
         the number of unique paths to endpoints reachable from trailheads
     """
-    array = load_puzzle_input(file_name)
+    grid = load_puzzle_input(file_name)
     total_score = 0
-    for row_num, row in enumerate(array):
-        for col_num, value in enumerate(row):
-            if value == 0:
-                ends, paths = follow_trail(row_num, col_num, array)
-                score = paths
-                total_score = total_score + score
+    for trailhead in grid.find('0'):
+        ends, paths = follow_trail(trailhead, grid)
+        score = paths
+        total_score = total_score + score
     return total_score
 
 
@@ -5,10 +5,16 @@ https://adventofcode.com/2024/day/11
 __author__ = "Conner Beard"
 
 import os
+import sys
 import time
 from functools import cache
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import cached_parse  # noqa: E402
+from common.profiling import profile  # noqa: E402
 
+
+@cached_parse
 def load_puzzle_input(file_name):
     """
 
@@ -42,6 +48,7 @@ def get_stone(stone):
         return tuple([int(stone * 2024)])
 
 
+@profile
 @cache  # memoization to shortcut previously seen stone/blink/depth combos
 def recursive_blink(stone, blinks, depth=0):
     """
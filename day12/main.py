@@ -5,9 +5,17 @@ https://adventofcode.com/2024/day/12
 __author__ = "Conner Beard"
 
 import os
+import sys
 import time
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import cached_parse  # noqa: E402
+from common.grid import Grid  # noqa: E402
+from common.profiling import profile  # noqa: E402
+from common.progress import Progress  # noqa: E402
 
+
+@cached_parse
 def load_puzzle_input(file_name):
     """
 
@@ -15,78 +23,69 @@ def load_puzzle_input(file_name):
         file_name (ascii text file): puzzle input
 
     Returns:
+        farm (Grid): the farm map, padding never matches a crop
     """
-    array = []
-    with open(file_name, 'r') as file:
-        for row in file.readlines():
-            array.append(list(row)[:-1])
-
-    return array
+    return Grid.from_file(file_name)
 
 
-def check_bounds(row, col, array):
-    """
-    check if array indexing is within the bounds of the array
-    Args:
-        row (int): array row
-        col (int): array col
-        array (list of lists): array to check bounds on
-    Returns:
-        (bool): True if in bounds, False if out of bounds
-    """
-    if (row < 0) | (col < 0):
-        return False
-    if row > (len(array) - 1):
-        return False
-    if col > (len(array[0]) - 1):
-        return False
-    return True
-
-
-def recursive_plot(farm, crop, row_num, col_num, inside_plot, depth=0):
+@profile
+def recursive_plot(farm, crop, tile, inside_plot, depth=0):
     """
     Hunts down connecting farm tiles and returns a set of all the tiles within
     one farm plot of the same crop type.
     Args:
-        farm (2d array): a map of the farm crops on a 2d gird
-
-        crop (str): the letter representation of the crop
+        farm (Grid): a map of the farm crops on a 2d gird
 
-        row_num (int): the row of the current tile
+        crop (int): the byte value of the crop letter
 
-        col_num (int): the col of the current tile
+        tile (int): the flat grid index of the current tile
 
-        inside_plot (set of coordinates): all of the tiles farm tiles currently
+        inside_plot (set of int): all of the tiles farm tiles currently
         identified as inside the current plot
 
         depth (int): the recursion depth
     Returns:
-        inside_plot(set of coordinates): all the farm tiles with the plot of
+        inside_plot(set of int): all the farm tiles with the plot of
         crop type
     """
-    inside_plot.add((row_num, col_num))
+    inside_plot.add(tile)
     depth = depth + 1
     if depth > 1000:
         raise Exception("Hit recursion limit")
 
-    for row_adder, col_adder in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-        if row_adder == col_adder == 0:
-            continue
-        target_row = row_num+row_adder
-        target_col = col_num+col_adder
-        if not check_bounds(target_row, target_col, farm):
-            continue
-
-        if ((farm[target_row][target_col] == crop) &
-           ((target_row, target_col) not in inside_plot)):
-            inside_plot.add((target_row, target_col))
-            inside_plot = recursive_plot(farm, crop,
-                                         target_row, target_col,
-                                         inside_plot, depth)
+    cells = farm.cells
+    for offset in farm.orthogonal_offsets:
+        target = tile + offset
+        if (cells[target] == crop) and (target not in inside_plot):
+            inside_plot.add(target)
+            inside_plot = recursive_plot(farm, crop, target, inside_plot,
+                                         depth)
 
     return inside_plot
 
 
+def find_plots(farm):
+    """
+    Split the farm into plots of connected tiles growing the same crop
+    Args:
+        farm (Grid): a map of the farm crops on a 2d gird
+    Returns:
+        plots (list of set of coordinates): every plot on the farm
+    """
+    checked_tiles = set()
+    plots = []
+    progress = Progress(farm.height * farm.width, 'day 12 tiles mapped')
+    for tile in farm.indices():
+        if tile not in checked_tiles:
+            new_plot = recursive_plot(farm, farm.cells[tile], tile,
+                                      inside_plot=set())
+            checked_tiles.update(new_plot)
+            plots.append({farm.position(index) for index in new_plot})
+            progress.update(len(new_plot))
+    progress.close()
+    return plots
+
+
 def get_perimeter(plot):
     """
     gets the perimeter value of the plot
@@ -224,19 +223,8 @@ def solve_part_1(file_name):
     Returns:
         price of a fencing the farm without discount
     """
-
-    checked_tiles = set()
-    plots = []
-
     farm = load_puzzle_input(file_name)
-
-    for row_num, row in enumerate(farm):
-        for col_num, crop in enumerate(row):
-            if (row_num, col_num) not in checked_tiles:
-                new_plot = recursive_plot(farm, crop, row_num, col_num, inside_plot=set())
-                for tile in new_plot:
-                    checked_tiles.add(tile)
-                plots.append(new_plot)
+    plots = find_plots(farm)
 
     total_price = 0
     for i in plots:
@@ -254,18 +242,8 @@ def solve_part_2(file_name):
     Returns:
         price of a fencing the farm with discount
     """
-    checked_tiles = set()
-    plots = []
-
     farm = load_puzzle_input(file_name)
-
-    for row_num, row in enumerate(farm):
-        for col_num, crop in enumerate(row):
-            if (row_num, col_num) not in checked_tiles:
-                new_plot = recursive_plot(farm, crop, row_num, col_num, inside_plot=set())
-                for tile in new_plot:
-                    checked_tiles.add(tile)
-                plots.append(new_plot)
+    plots = find_plots(farm)
 
     total_price = 0
     for i in plots:
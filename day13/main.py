@@ -5,10 +5,15 @@ https://adventofcode.com/2024/day/13
 __author__ = "Conner Beard"
 
 import os
+import sys
 import time
 from decimal import Decimal, getcontext
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import cached_parse  # noqa: E402
 
+
+@cached_parse
 def load_puzzle_input(file_name, offset=0):
     """
     Args:
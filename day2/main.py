@@ -5,8 +5,25 @@ https://adventofcode.com/2024/day/2
 __author__ = "Conner Beard"
 
 import os
+import sys
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import cached_parse  # noqa: E402
+from common.loader import MappedInput  # noqa: E402
 
+try:
+    import numpy as np
+except ImportError:  # the batched validators and 'array' mode need numpy
+    np = None
+
+DEFAULT_MODE = 'list' if np is None else 'array'
+# the loader DEFAULT_MODE parses with, timed by common.benchmark
+DEFAULT_LOADER = 'load_reactor_reports' if np is None else 'load_report_matrix'
+# fills the unused tail of short reports in a report matrix
+PAD = -1
+
+
+@cached_parse
 def load_reactor_reports(file_name):
     """
     Read in the puzzle input file and extract the reactor reports
@@ -18,13 +35,113 @@ def load_reactor_reports(file_name):
     Returns:
         report_list (list of lists of int): reactor reports
     """
-    report_list = []
-    with open(file_name, 'r') as file:
-        for report in [x.split() for x in file.readlines()]:
-            report_list.append([int(x) for x in report])
+    with MappedInput(file_name) as puzzle:
+        report_list = [report for report in puzzle.int_rows() if report]
     return report_list
 
 
+@cached_parse
+def load_report_matrix(file_name, pad_value=PAD):
+    """
+    Read in the puzzle input file and pack the reactor reports into one
+    numpy matrix, the levels are parsed straight from the file buffer.
+
+    Args:
+        file_name (ascii text file): puzzle input, one report per line
+        each report ints seperated by whitespace.
+
+        pad_value (int): value filling the unused tail of short reports
+
+    Returns:
+        matrix (numpy int64 array): one report per row
+
+        lengths (numpy int64 array): number of levels in each report
+    """
+    with MappedInput(file_name) as puzzle:
+        values, counts = puzzle.line_ints()
+    values = np.asarray(values, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+    lengths = counts[counts > 0]
+    width = int(lengths.max()) if len(lengths) else 0
+    matrix = np.full((len(lengths), width), pad_value, dtype=np.int64)
+    # row and column of every level, levels are in file order
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    cols = np.arange(len(values)) - np.repeat(starts, lengths)
+    matrix[rows, cols] = values
+    return matrix, lengths
+
+
+def min_removals(report, max_removals=None, min_step=1, max_step=3):
+    """
+    Find the fewest levels that must be removed to make a report safe.
+
+    Dynamic programming over the levels kept, for each direction
+    removals[i] is the fewest removals leaving a safe report that ends with
+    level i. Level i can only follow one of the max_removals + 1 levels
+    before it, so the search is O(n * k) for k = max_removals.
+
+    Args:
+        report (list of int): levels of one report
+
+        max_removals (int): give up once more removals than this are needed,
+        None allows any number
+
+        min_step (int): the minimum difference allowed between adjacent levels
+
+        max_step (int): the maximum difference allowed between adjacent levels
+
+    Returns:
+        removals (int): the minimum number of removals, or None if more than
+        max_removals are needed
+    """
+    length = len(report)
+    if length == 0:
+        return 0
+    if max_removals is None:
+        max_removals = length
+    unreachable = max_removals + 1
+    best = unreachable
+
+    for direction in (1, -1):
+        removals = [unreachable] * length
+        for index in range(length):
+            # drop every level before this one
+            fewest = index
+            for previous in range(max(0, index - max_removals - 1), index):
+                step = direction * (report[index] - report[previous])
+                if min_step <= step <= max_step:
+                    fewest = min(fewest, removals[previous] + index -
+                                 previous - 1)
+            removals[index] = min(fewest, unreachable)
+            # drop every level after this one
+            best = min(best, removals[index] + length - 1 - index)
+    if best > max_removals:
+        return None
+    return best
+
+
+def stream_verdicts(reports, tolerance=0, min_step=1, max_step=3):
+    """
+    Lazily test many reports, nothing is held beyond the current report so
+    reports can come from an arbitrarily large source
+
+    Args:
+        reports (iterable of lists of int): reactor reports
+
+        tolerance (int): the number of levels that may be removed
+
+        min_step (int): the minimum difference allowed between adjacent levels
+
+        max_step (int): the maximum difference allowed between adjacent levels
+
+    Yields:
+        result (bool): true for each report that is safe
+    """
+    for report in reports:
+        yield min_removals(report, tolerance, min_step, max_step) is not None
+
+
 def test_monotonic(series, max_slope=3, tolerance=0):
     """
     Tests if a serise of numbers always increases/decreases
@@ -35,55 +152,158 @@ def test_monotonic(series, max_slope=3, tolerance=0):
         max_slope (int): the maximum difference allowed between adjacent
         elements
 
-        tolerance (int): the number of check failures allowed before the series
-        is makred as unsafe
+        tolerance (int): the number of elements that may be removed before
+        the series is makred as unsafe
 
     Returns:
         result (bool): returns true if the series is safe
     """
-    if abs(series[0] - series[1]) > max_slope:
-        series = series[1:]
-        tolerance = tolerance - 1
-        if tolerance < 0:
-            return False
-
-    previous_value = series[0]
-    previous_gradiant = None
-    for value in series[1:]:
-        pop_value = False
-        slope = value - previous_value
-
-        if abs(slope) > max_slope:
-            pop_value = True
-
-        if value > previous_value:
-            gradiant = 1
-        elif value < previous_value:
-            gradiant = -1
-        else:
-            gradiant = 0
-            pop_value = True
-
-        if (gradiant != previous_gradiant) and (previous_gradiant is not None):
-            pop_value = True
-
-        if pop_value and (tolerance != 0):
-            tolerance = tolerance - 1
-            previous_value = previous_value
-            previous_gradiant = previous_gradiant
-            continue
-        elif pop_value and (tolerance == 0):
-            return False
-        elif pop_value is False:
-            previous_value = value
-            previous_gradiant = gradiant
-        else:
-            raise Exception('Invalid case!')
-
-    return True
-
-
-def solve_part_1(file_name):
+    return min_removals(series, tolerance, 1, max_slope) is not None
+
+
+def test_dampened(report, min_step=1, max_step=3):
+    """
+    Tests in one pass if a report is safe once at most one level is removed.
+
+    For each direction the prefix and suffix validity of the report is
+    computed, removing level k works when the levels before k and the levels
+    after k are both safe and the step bridging k is valid, so no shortened
+    copies of the report are ever built.
+
+    Args:
+        report (list of int): levels of one report
+
+        min_step (int): the minimum difference allowed between adjacent levels
+
+        max_step (int): the maximum difference allowed between adjacent levels
+
+    Returns:
+        result (bool): returns true if the report is safe with one removal
+    """
+    length = len(report)
+    if length <= 2:
+        return True
+
+    for direction in (1, -1):
+        def valid(first, second):
+            return min_step <= direction * (report[second] - report[first]) \
+                <= max_step
+
+        # prefix[i]: levels 0..i are safe, suffix[i]: levels i..end are safe
+        prefix = [True] * length
+        for index in range(1, length):
+            prefix[index] = prefix[index - 1] and valid(index - 1, index)
+        suffix = [True] * length
+        for index in range(length - 2, -1, -1):
+            suffix[index] = suffix[index + 1] and valid(index, index + 1)
+
+        if prefix[-1] or suffix[1] or prefix[-2]:
+            return True
+        for index in range(1, length - 1):
+            if prefix[index - 1] and suffix[index + 1] and \
+                    valid(index - 1, index + 1):
+                return True
+    return False
+
+
+def pad_reports(report_list, pad_value=PAD):
+    """
+    Pack ragged reports into one rectangular numpy matrix
+
+    Args:
+        report_list (list of lists of int): reactor reports
+
+        pad_value (int): value filling the unused tail of short reports
+
+    Returns:
+        matrix (numpy int64 array): one report per row
+
+        lengths (numpy int64 array): number of levels in each report
+    """
+    lengths = np.fromiter((len(report) for report in report_list),
+                          dtype=np.int64, count=len(report_list))
+    width = int(lengths.max()) if len(lengths) else 0
+    matrix = np.full((len(report_list), width), pad_value, dtype=np.int64)
+    mask = np.arange(width) < lengths[:, None]
+    matrix[mask] = [level for report in report_list for level in report]
+    return matrix, lengths
+
+
+def test_safe_batch(matrix, lengths, min_step=1, max_step=3):
+    """
+    Tests every report of a report matrix for safety at once using masks of
+    the adjacent level differences
+
+    Args:
+        matrix (numpy int64 array): one report per row, see pad_reports
+
+        lengths (numpy int64 array): number of levels in each report
+
+        min_step (int): the minimum difference allowed between adjacent levels
+
+        max_step (int): the maximum difference allowed between adjacent levels
+
+    Returns:
+        safe (numpy bool array): true for each safe report
+    """
+    count, width = matrix.shape
+    steps = np.diff(matrix, axis=1)
+    # steps reaching into the padding never fail
+    padding = np.arange(max(width - 1, 0)) >= lengths[:, None] - 1
+    magnitude = np.abs(steps)
+    in_bounds = ((magnitude >= min_step) & (magnitude <= max_step)) | padding
+    sign = np.sign(steps)
+    # every real step must share the sign of the first step
+    same_sign = (sign == sign[:, :1]) | padding
+    return (in_bounds & same_sign).all(axis=1)
+
+
+def test_dampened_batch(matrix, lengths, min_step=1, max_step=3):
+    """
+    The test_dampened check for every report of a report matrix at once,
+    prefix and suffix validity become cumulative ands along the rows.
+
+    Args:
+        matrix (numpy int64 array): one report per row, see pad_reports
+
+        lengths (numpy int64 array): number of levels in each report
+
+        min_step (int): the minimum difference allowed between adjacent levels
+
+        max_step (int): the maximum difference allowed between adjacent levels
+
+    Returns:
+        safe (numpy bool array): true for each report safe with one removal
+    """
+    count, width = matrix.shape
+    if width <= 2:
+        return np.ones(count, dtype=bool)
+    last = lengths[:, None] - 1
+    steps = np.diff(matrix, axis=1)
+    # steps and bridges reaching into the padding never fail
+    step_padding = np.arange(width - 1) >= last
+    bridges = matrix[:, 2:] - matrix[:, :-2]
+    bridge_padding = np.arange(2, width) > last
+
+    safe = np.zeros(count, dtype=bool)
+    ones = np.ones((count, 1), dtype=bool)
+    for direction in (1, -1):
+        scaled = direction * steps
+        valid = ((scaled >= min_step) & (scaled <= max_step)) | step_padding
+        scaled = direction * bridges
+        bridge = ((scaled >= min_step) & (scaled <= max_step)) | \
+            bridge_padding
+        # before[:, k]: levels 0..k-1 are safe, after[:, k]: levels k+1..end
+        prefix = np.logical_and.accumulate(valid, axis=1)
+        suffix = np.logical_and.accumulate(valid[:, ::-1], axis=1)[:, ::-1]
+        before = np.hstack((ones, ones, prefix[:, :-1]))
+        after = np.hstack((suffix[:, 1:], ones, ones))
+        bridge = np.hstack((ones, bridge, ones))
+        safe |= (before & after & bridge).any(axis=1)
+    return safe
+
+
+def solve_part_1(file_name, mode=DEFAULT_MODE):
     """
     Determine how many given reactor reports are safe
 
@@ -97,9 +317,15 @@ def solve_part_1(file_name):
         file_name (ascii text file): puzzle input, one report per line
         each report ints seperated by whitespace.
 
+        mode ('list' or 'array'): test reports one by one or all at once as
+        a numpy matrix
+
     Returns:
         the number of safe reactor reports
     """
+    if mode == 'array':
+        return int(test_safe_batch(*load_report_matrix(file_name)).sum())
+
     report_list = load_reactor_reports(file_name)
     safe_reports = []
     for report in report_list:
@@ -108,7 +334,7 @@ def solve_part_1(file_name):
     return len(safe_reports)
 
 
-def solve_part_2(file_name):
+def solve_part_2(file_name, mode=DEFAULT_MODE):
     """
     like part 1 except we can ignore one failure
 
@@ -116,20 +342,20 @@ def solve_part_2(file_name):
         file_name (ascii text file): puzzle input, one report per line
         each report ints seperated by whitespace.
 
+        mode ('list' or 'array'): test reports one by one or all at once as
+        a numpy matrix
+
     Returns:
         the number of safe reactor reports while ignoring one failing element
     """
+    if mode == 'array':
+        return int(test_dampened_batch(*load_report_matrix(file_name)).sum())
+
     report_list = load_reactor_reports(file_name)
     safe_reports = []
     for report in report_list:
-        if test_monotonic(report) is True:
+        if test_dampened(report) is True:
             safe_reports.append(report)
-        else:
-            for index, value in enumerate(report):
-                subset = report[0:index] + report[index+1:]
-                if test_monotonic(subset) is True:
-                    safe_reports.append(subset)
-                    break
     return len(safe_reports)
 
 
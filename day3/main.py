@@ -6,71 +6,426 @@ __author__ = "Conner Beard"
 
 import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 
+# bytes of memory read per chunk by InstructionSet.scan
+READ_SIZE = 1 << 20
 
-def load_puzzle_input(file_name):
+
+class InstructionSet():
+    """
+    A table of instructions of the form name(arg,...,arg) taking
+    non-negative integer arguments.
+
+    Every registered instruction is compiled into one combined pattern with
+    a capture group per instruction, the index of the group that matched
+    looks up a caller bound to its handler and argument groups in a dispatch
+    table. Handlers are called as handler(machine, *args) and update the
+    Machine in place, so new instructions are added without touching the
+    scanner.
+
+    Parallel scans split the memory at arbitrary byte offsets and stitch the
+    ranges back together, which only holds while handlers add to the
+    machine's total and, if registered with changes_state, set whether mul
+    is enabled, and no instruction name ends with another one, a range
+    starting mid name would run the shorter instruction as well. Names can
+    not contain brackets.
+    """
+
+    def __init__(self):
+        self._instructions = {}
+        self._compiled = None
+        # MB/s of the last scan_memory run with this instruction set
+        self.throughput = None
+
+    def __getstate__(self):
+        # the dispatch table holds closures, workers compile their own
+        state = self.__dict__.copy()
+        state['_compiled'] = None
+        return state
+
+    def register(self, name, arity, handler, changes_state=False):
+        """
+        Args:
+            name (str): instruction name, matched literally
+
+            arity (int): number of integer arguments
+
+            handler (callable): called as handler(machine, *args) for every
+            instruction found, must be picklable for parallel scans
+
+            changes_state (bool): whether handler sets more of the machine's
+            state than its total
+        """
+        if '(' in name or ')' in name:
+            raise ValueError(f'instruction {name!r} contains a bracket')
+        for other in self._instructions:
+            if other != name and (other.endswith(name) or
+                                  name.endswith(other)):
+                raise ValueError(f'instruction {name!r} and {other!r} '
+                                 'overlap, one name ends with the other')
+        self._instructions[name] = (arity, handler, changes_state)
+        self._compiled = None
+
+    @property
+    def changes_state(self):
+        """
+        Returns:
+            (bool): whether any instruction sets more of the machine's state
+            than its total
+        """
+        return any(changes for _, _, changes in self._instructions.values())
+
+    def compile(self):
+        """
+        Build the combined pattern, partial token pattern and dispatch table,
+        called automatically by run
+
+        Returns:
+            pattern (re.Pattern): matches any complete instruction
+
+            partial (re.Pattern): matches the start of an instruction cut
+            off by the end of the buffer
+
+            table (dict of int: callable): group index of each instruction
+            mapped to a caller running its handler on a machine, called as
+            caller(machine, match)
+
+            single ((re.Pattern, callable)): for a set of one instruction, a
+            pattern whose findall gives a tuple of arguments per instruction
+            and a caller taking that tuple, None otherwise
+        """
+        if self._compiled is not None:
+            return self._compiled
+        alternatives = []
+        partials = []
+        table = {}
+        group = 1
+        for name, (arity, handler, _) in self._instructions.items():
+            literal = re.escape(name + '(').encode()
+            arguments = rb','.join([rb'(\d+)'] * arity)
+            alternatives.append(b'(' + literal + arguments + rb'\))')
+            # the pieces of the instruction bar its closing bracket
+            pieces = [re.escape(char).encode() for char in name + '(']
+            for arg in range(arity):
+                if arg:
+                    pieces.append(b',')
+                pieces.append(rb'\d+')
+            partials.append(_nested_prefix(pieces))
+            table[group] = _bind(handler, arity, group + 1)
+            group = group + 1 + arity
+        pattern = re.compile(b'|'.join(alternatives))
+        partial = re.compile(b'(?:' + b'|'.join(partials) + rb')\Z')
+        single = None
+        if len(self._instructions) == 1:
+            # the empty group keeps findall returning tuples at any arity
+            single = (re.compile(alternatives[0][1:-1] + b'()'),
+                      _bind(handler, arity, 0))
+        self._compiled = (pattern, partial, table, single)
+        return self._compiled
+
+    def run(self, machine, file, start=0, stop=None, read_size=READ_SIZE):
+        """
+        Run every instruction starting between start and stop on machine.
+        The memory is scanned in fixed size chunks, so memory use does not
+        grow with the size of the file, an instruction cut off by the end of
+        a chunk is carried over and completed by the next one.
+
+        Args:
+            machine (Machine): machine the instructions update
+
+            file (binary file): open puzzle input
+
+            start (int): byte offset to start scanning at
+
+            stop (int): only instructions starting before this offset are
+            run, reading continues past it just far enough to complete them.
+            None scans to the end of the file
+
+            read_size (int): bytes read per chunk
+        """
+        pattern, _, table, single = self.compile()
+        for offset, buffer, end in self._chunks(file, start, read_size):
+            if stop is not None and offset >= stop:
+                return
+            if single is not None and (stop is None or offset + end <= stop):
+                # every instruction in the chunk runs, no positions needed
+                single_pattern, caller = single
+                for args in single_pattern.findall(buffer, 0, end):
+                    caller(machine, args)
+            elif stop is None or offset + end <= stop:
+                for match in pattern.finditer(buffer, 0, end):
+                    table[match.lastindex](machine, match)
+            else:
+                limit = stop - offset
+                for match in pattern.finditer(buffer, 0, end):
+                    if match.start() >= limit:
+                        return
+                    table[match.lastindex](machine, match)
+
+    def converge(self, first, second, file, start=0, stop=None,
+                 read_size=READ_SIZE):
+        """
+        Run the instructions on two machines until one leaves them in the
+        same state, see run
+
+        Args:
+            first (Machine): one machine the instructions update
+
+            second (Machine): the other machine
+
+            file (binary file): open puzzle input
+
+            start (int): byte offset to start scanning at
+
+            stop (int): only instructions starting before this offset are
+            run, None scans to the end of the file
+
+            read_size (int): bytes read per chunk
+
+        Returns:
+            (int): byte offset just past the instruction the machines
+            converged on, None if they were still apart at stop
+        """
+        pattern, _, table, _ = self.compile()
+        for offset, buffer, end in self._chunks(file, start, read_size):
+            if stop is not None and offset >= stop:
+                return None
+            for match in pattern.finditer(buffer, 0, end):
+                if stop is not None and offset + match.start() >= stop:
+                    return None
+                caller = table[match.lastindex]
+                caller(first, match)
+                caller(second, match)
+                if first.same_state(second):
+                    return offset + match.end()
+        return None
+
+    def _chunks(self, file, start, read_size):
+        # yields each chunk's file offset, buffer and the end of its complete
+        # instructions, the instruction cut off after that is carried over
+        _, partial_pattern, _, _ = self.compile()
+        file.seek(start)
+        offset = start
+        carry = b''
+        for chunk in iter(lambda: file.read(read_size), b''):
+            buffer = carry + chunk
+            # a cut off instruction has no closing bracket
+            partial = partial_pattern.search(buffer, buffer.rfind(b')') + 1)
+            end = len(buffer) if partial is None else partial.start()
+            yield offset, buffer, end
+            carry = buffer[end:]
+            offset = offset + end
+
+
+def _bind(handler, arity, first):
+    # caller converting the arity arguments of a match or findall tuple from
+    # index first on and running handler with them, unrolled for the common
+    # arities
+    if arity == 0:
+        return lambda machine, match: handler(machine)
+    if arity == 1:
+        return lambda machine, match: handler(machine, int(match[first]))
+    if arity == 2:
+        second = first + 1
+        return lambda machine, match: handler(machine, int(match[first]),
+                                              int(match[second]))
+    groups = range(first, first + arity)
+    return lambda machine, match: handler(
+        machine, *[int(match[group]) for group in groups])
+
+
+def _nested_prefix(pieces):
+    # every proper prefix of the instruction, "a(?:b(?:c)?)?"
+    nested = b''
+    for piece in reversed(pieces):
+        nested = piece + (b'(?:' + nested + b')?' if nested else b'')
+    return nested
+
+
+class Machine():
+    """
+    State of the computer while running the instructions in its memory
+    """
+
+    # evaluate_range stitches ranges on this state alone, handlers cannot
+    # add to it
+    __slots__ = ('enabled', 'total')
+
+    def __init__(self, enabled=True):
+        """
+        Args:
+            enabled (bool): whether mul instructions start out enabled
+        """
+        self.enabled = enabled
+        self.total = 0
+
+    def same_state(self, other):
+        """
+        Args:
+            other (Machine): machine to compare with
+
+        Returns:
+            (bool): whether every part of the state but the total matches,
+            handlers only add to the total
+        """
+        return self.enabled == other.enabled
+
+
+def mul(machine, left, right):
+    """
+    mul(X,Y) adds X * Y to the total while mul is enabled
     """
-    Read in the corrupted computer memory and extract it as a long string
+    if machine.enabled:
+        machine.total = machine.total + left * right
+
+
+def do(machine):
+    """
+    do() enables mul instructions
+    """
+    machine.enabled = True
+
+
+def dont(machine):
+    """
+    don't() disables mul instructions
+    """
+    machine.enabled = False
+
+
+mul_instructions = InstructionSet()
+mul_instructions.register('mul', 2, mul)
+
+memory_instructions = InstructionSet()
+memory_instructions.register('mul', 2, mul)
+memory_instructions.register('do', 0, do, changes_state=True)
+memory_instructions.register("don't", 0, dont, changes_state=True)
+
+
+def evaluate_range(file_name, start=0, stop=None,
+                   instructions=memory_instructions, read_size=READ_SIZE):
+    """
+    Run the instructions starting in one byte range of the memory.
+
+    Whether mul is enabled when a range after the first is entered depends
+    on the ranges before it, so the range is run on two machines, one
+    entering enabled and one disabled, until an instruction leaves them in
+    the same state. From there on only one machine needs to run. The first
+    range, and any range of instructions that never change the state, only
+    runs enabled.
 
     Args:
         file_name (ascii text file): puzzle input, bulk computer memory
 
+        start (int): byte offset of the start of the range
+
+        stop (int): byte offset of the end of the range, None for the end
+        of the file
+
+        instructions (InstructionSet): the instructions to run
+
+        read_size (int): bytes read per chunk
+
     Returns:
-        memory (string): full computer memory as a string
+        sum_if_enabled (int): the sum if mul is enabled entering the range
+
+        sum_if_disabled (int): the sum if mul is disabled entering the range,
+        None if the range only ran enabled
+
+        exit_state (bool): whether mul is enabled leaving the range, None if
+        it depends on the state entering the range
     """
-    with open(file_name, 'r') as file:
-        memory = file.read()
-    return memory
+    enabled = Machine(True)
+    with open(file_name, 'rb') as file:
+        if start == 0 or not instructions.changes_state:
+            # the state entering the range is known or can not matter
+            instructions.run(enabled, file, start, stop, read_size)
+            exit_state = enabled.enabled if start == 0 else None
+            return enabled.total, None, exit_state
+        disabled = Machine(False)
+        converged = instructions.converge(enabled, disabled, file, start,
+                                          stop, read_size)
+        if converged is None:
+            return enabled.total, disabled.total, None
+        diverged = enabled.total - disabled.total
+        instructions.run(enabled, file, converged, stop, read_size)
+    return enabled.total, enabled.total - diverged, enabled.enabled
 
 
-def solve_part_1(file_name):
+def scan_memory(file_name, instructions=memory_instructions, jobs=1,
+                read_size=READ_SIZE):
     """
+    Run the instructions in memory and add up the enabled mul instructions,
+    optionally splitting the memory into byte ranges evaluated in parallel
+    and stitched back together in order. The scan rate is recorded in
+    instructions.throughput.
+
     Args:
-        file_name (ascii text file): puzzle input, one report per line
-        each report ints seperated by whitespace.
+        file_name (ascii text file): puzzle input, bulk computer memory
+
+        instructions (InstructionSet): the instructions to run
+
+        jobs (int): number of worker processes, 1 scans in process
+
+        read_size (int): bytes read per chunk
 
     Returns:
-        the multiplication result of the uncorrupted computer memory sections
+        match_sum (int): the sum of the enabled mul instructions
     """
-    memory = load_puzzle_input(file_name)
-    matches = re.findall('mul\((\d+,\d+)\)', memory)
+    start_time = time.perf_counter()
+    size = os.path.getsize(file_name)
+    if jobs <= 1 or size < jobs * read_size:
+        results = [evaluate_range(file_name, 0, None, instructions,
+                                  read_size)]
+    else:
+        bounds = [size * job // jobs for job in range(jobs + 1)]
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(evaluate_range, file_name, start, stop,
+                                       instructions, read_size)
+                       for start, stop in zip(bounds[:-1], bounds[1:])]
+            results = [future.result() for future in futures]
+
     match_sum = 0
-    for match in matches:
-        pair = list(map(int, match.split(',')))
-        mult = pair[0] * pair[1]
-        match_sum = match_sum + mult
+    mult_enabled = True
+    for sum_if_enabled, sum_if_disabled, exit_state in results:
+        if mult_enabled:
+            match_sum = match_sum + sum_if_enabled
+        else:
+            match_sum = match_sum + sum_if_disabled
+        if exit_state is not None:
+            mult_enabled = exit_state
+    elapsed = time.perf_counter() - start_time
+    instructions.throughput = size / 1e6 / elapsed if elapsed else None
     return match_sum
 
 
-def solve_part_2(file_name):
+def solve_part_1(file_name, jobs=1):
     """
     Args:
-        file_name (ascii text file): puzzle input, one report per line
-        each report ints seperated by whitespace.
+        file_name (ascii text file): puzzle input, bulk computer memory
+
+        jobs (int): number of worker processes
 
     Returns:
-       the multiplication result of the uncorrupted computer memory sections
-       wrapped by a do() and don't() clause
+        the multiplication result of the uncorrupted computer memory sections
     """
-    memory = load_puzzle_input(file_name)
+    return scan_memory(file_name, mul_instructions, jobs=jobs)
 
-    matches = re.findall("(?:(mul)\((\d+),(\d+)\))|(?:(do)\(\)|(?:(don't)\(\)))", memory)
-    match_sum = 0
-    mult_enabled = True
-    for match in matches:
-        match = list(match)
-        while '' in match:
-            match.remove('')
-
-        if match[0] == 'do':
-            mult_enabled = True
-        elif match[0] == "don't":
-            mult_enabled = False
-        elif match[0] == 'mul':
-            if mult_enabled:
-                match_sum = match_sum + int(match[1]) * int(match[2])
 
-    return match_sum
+def solve_part_2(file_name, jobs=1):
+    """
+    Args:
+        file_name (ascii text file): puzzle input, bulk computer memory
+
+        jobs (int): number of worker processes
+
+    Returns:
+       the multiplication result of the uncorrupted computer memory sections
+       wrapped by a do() and don't() clause
+    """
+    return scan_memory(file_name, memory_instructions, jobs=jobs)
 
 
 if __name__ == '__main__':
@@ -85,4 +440,5 @@ if __name__ == '__main__':
     assert solve_part_2(test_input_2_path) == 48
     solution_2 = solve_part_2(input_path)
     print(f"Day 3 part 2 solution: {solution_2}")
+    print(f"Day 3 scan throughput: {memory_instructions.throughput:.1f} MB/s")
 
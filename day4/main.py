@@ -5,10 +5,35 @@ https://adventofcode.com/2024/day/4
 __author__ = "Conner Beard"
 
 import os
+import sys
 import time
-from itertools import product
-
-
+from collections import deque
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import cached_parse  # noqa: E402
+from common.grid import Grid  # noqa: E402
+
+try:
+    import numpy as np
+except ImportError:  # stencils are matched in pure python without numpy
+    np = None
+
+# 'MAS' twice in the shape of an X, in each of its four orientations
+XMAS_STENCILS = (('M.S',
+                  '.A.',
+                  'M.S'),
+                 ('M.M',
+                  '.A.',
+                  'S.S'),
+                 ('S.M',
+                  '.A.',
+                  'S.M'),
+                 ('S.S',
+                  '.A.',
+                  'M.M'))
+
+
+@cached_parse
 def load_puzzle_input(file_name):
     """
     Read in the crossword puzzle
@@ -17,107 +42,374 @@ def load_puzzle_input(file_name):
         file_name (ascii text file): puzzle input
 
     Returns:
-        array (2d array): crossword as 2d array
+        grid (Grid): crossword
+    """
+    return Grid.from_file(file_name)
+
+
+class WordSearch():
+    """
+    Finds every occurrence of many words in a crossword in one pass.
+
+    The words and their reverses are compiled into an Aho-Corasick automaton
+    with a full transition table, then each row, column, diagonal and
+    anti-diagonal of the grid is fed through it once. Reading a line
+    backwards is the same as finding a reversed word forwards, so only one
+    direction of each line is scanned. Palindromes are only added once so
+    they are not counted twice, and single letters are only counted along
+    the rows.
+    """
+
+    def __init__(self, words):
+        """
+        Args:
+            words (list of str): words to search for
+        """
+        self.words = list(words)
+        # transitions[node][byte] is the next node, node 0 is the root
+        self._transitions = [[0] * 256]
+        # (word, forward) for every word ending at each node
+        self._outputs = [[]]
+        # the trie of patterns, only needed while building the automaton
+        children = [{}]
+        for word in self.words:
+            self._add(children, word.encode(), (word, True))
+            if word != word[::-1]:
+                self._add(children, word[::-1].encode(), (word, False))
+        self._link(children)
+
+    def _add(self, children, pattern, output):
+        node = 0
+        for byte in pattern:
+            if byte not in children[node]:
+                children[node][byte] = len(self._transitions)
+                self._transitions.append([0] * 256)
+                self._outputs.append([])
+                children.append({})
+            node = children[node][byte]
+        self._outputs[node].append(output)
+
+    def _link(self, children):
+        # breadth first so a node's failure link is finished before its
+        # children need it, missing transitions follow the failure link
+        failure = [0] * len(self._transitions)
+        queue = deque()
+        for byte, child in children[0].items():
+            self._transitions[0][byte] = child
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            self._outputs[node] = self._outputs[node] + \
+                self._outputs[failure[node]]
+            row = self._transitions[node]
+            row[:] = self._transitions[failure[node]]
+            for byte, child in children[node].items():
+                failure[child] = self._transitions[failure[node]][byte]
+                row[byte] = child
+                queue.append(child)
+
+    def lines(self, grid):
+        """
+        Args:
+            grid (Grid): crossword to search in
+
+        Yields:
+            start (int): flat index of the first cell of a line
+
+            step (int): flat index step along the line
+
+            length (int): number of cells in the line
+
+            direction ((int, int)): the (row, col) step along the line
+        """
+        height = grid.height
+        width = grid.width
+        stride = grid.stride
+        for row in range(height):
+            yield grid.index(row, 0), 1, width, (0, 1)
+        for col in range(width):
+            yield grid.index(0, col), stride, height, (1, 0)
+        # down-right diagonals start on the top row or left column,
+        # down-left diagonals on the top row or right column
+        for col in range(width):
+            yield grid.index(0, col), stride + 1, min(height, width - col), \
+                (1, 1)
+            yield grid.index(0, col), stride - 1, min(height, col + 1), \
+                (1, -1)
+        for row in range(1, height):
+            yield grid.index(row, 0), stride + 1, min(height - row, width), \
+                (1, 1)
+            yield grid.index(row, width - 1), stride - 1, \
+                min(height - row, width), (1, -1)
+
+    def search(self, grid, positions=False):
+        """
+        Args:
+            grid (Grid): crossword to search in
+
+            positions (bool): also return where every match is
+
+        Returns:
+            counts (dict of str: int): number of matches of each word, or if
+            positions is set, each word mapped to a list of its matches,
+            each a list of (row, col) positions in word order
+        """
+        transitions = self._transitions
+        outputs = self._outputs
+        cells = grid.cells
+        counts = dict.fromkeys(self.words, 0)
+        found = {word: [] for word in self.words}
+        for start, step, length, direction in self.lines(grid):
+            node = 0
+            # a one column grid without padding has a zero anti-diagonal
+            # step, its lines are all a single cell
+            line = cells[start:start + step * (length - 1) + 1:step or 1]
+            for offset, byte in enumerate(line):
+                node = transitions[node][byte]
+                for word, forward in outputs[node]:
+                    if len(word) == 1 and direction != (0, 1):
+                        # a single letter lies on every line through its
+                        # cell, only count it along the rows
+                        continue
+                    counts[word] = counts[word] + 1
+                    if positions:
+                        found[word].append(self._match_cells(
+                            grid, start, step, offset, len(word), forward))
+        return found if positions else counts
+
+    @staticmethod
+    def _match_cells(grid, start, step, offset, length, forward):
+        # offset is where the match ends along the line
+        first = offset - length + 1
+        cells = [grid.position(start + step * index)
+                 for index in range(first, offset + 1)]
+        return cells if forward else cells[::-1]
+
+
+class WordIndex():
+    """
+    The position of every match of a set of words in a crossword, kept per
+    word and per direction, and kept up to date as cells are edited.
+
+    Only the placements of a word that pass through an edited cell can
+    change, so an edit re-checks those few placements instead of searching
+    the whole grid again. Like WordSearch, palindromes are only indexed in
+    the four forward directions and single letters only along the rows.
+    """
+
+    # (row, col) steps, the first four are the forward directions
+    DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1),
+                  (0, -1), (-1, 0), (-1, -1), (-1, 1))
+
+    def __init__(self, grid, words):
+        """
+        Args:
+            grid (Grid): crossword to index, update edits it in place
+
+            words (list of str): words to index
+        """
+        self.grid = grid
+        self.words = list(words)
+        # word -> direction -> set of (row, col) of the word's first letter
+        self.matches = {word: {direction: set()
+                               for direction in self.directions(word)}
+                        for word in self.words}
+        for word, found in WordSearch(self.words).search(
+                grid, positions=True).items():
+            for cells in found:
+                if len(cells) == 1:
+                    direction = (0, 1)
+                else:
+                    direction = (cells[1][0] - cells[0][0],
+                                 cells[1][1] - cells[0][1])
+                self.matches[word][direction].add(cells[0])
+
+    def directions(self, word):
+        """
+        Args:
+            word (str): an indexed word
+
+        Returns:
+            (tuple of (int, int)): the directions the word is indexed in
+        """
+        if len(word) == 1:
+            return self.DIRECTIONS[:1]
+        if word == word[::-1]:
+            return self.DIRECTIONS[:4]
+        return self.DIRECTIONS
+
+    def count(self, word=None):
+        """
+        Args:
+            word (str): word to count, None counts every word
+
+        Returns:
+            (int): number of matches
+        """
+        words = self.words if word is None else [word]
+        return sum(len(starts) for word in words
+                   for starts in self.matches[word].values())
+
+    def positions(self, word, direction=None):
+        """
+        Args:
+            word (str): an indexed word
+
+            direction ((int, int)): only matches in this direction, None for
+            every direction
+
+        Returns:
+            (list of (int, int)): sorted positions of the word's first letter
+        """
+        if direction is not None:
+            return sorted(self.matches[word][direction])
+        return sorted(start for starts in self.matches[word].values()
+                      for start in starts)
+
+    def update(self, row, col, char):
+        """
+        Change one cell of the grid and re-check every placement of every
+        word that passes through it
+
+        Args:
+            row (int): grid row
+
+            col (int): grid col
+
+            char (str): the cell's new character
+
+        Returns:
+            (int): change in the total number of matches
+
+        Raises:
+            IndexError: if (row, col) is outside the grid
+        """
+        if not self.grid.in_bounds(row, col):
+            raise IndexError(f'cell ({row}, {col}) is outside the '
+                             f'{self.grid.height}x{self.grid.width} grid')
+        self.grid[row, col] = char
+        change = 0
+        for word in self.words:
+            length = len(word)
+            for direction, starts in self.matches[word].items():
+                row_step, col_step = direction
+                for letter in range(length):
+                    start = (row - row_step * letter, col - col_step * letter)
+                    found = self._matches_at(word, start, direction)
+                    if found and start not in starts:
+                        starts.add(start)
+                        change = change + 1
+                    elif not found and start in starts:
+                        starts.remove(start)
+                        change = change - 1
+        return change
+
+    def _matches_at(self, word, start, direction):
+        grid = self.grid
+        length = len(word)
+        end = (start[0] + direction[0] * (length - 1),
+               start[1] + direction[1] * (length - 1))
+        if not (grid.in_bounds(*start) and grid.in_bounds(*end)):
+            return False
+        index = grid.index(*start)
+        step = direction[0] * grid.stride + direction[1]
+        cells = grid.cells
+        for letter, byte in enumerate(word.encode()):
+            if cells[index + step * letter] != byte:
+                return False
+        return True
+
+
+def stencil_cells(stencil, wildcard='.'):
+    """
+    Args:
+        stencil (list of str): rows of a 2d pattern, all the same length
+
+        wildcard (str): character matching any cell
+
+    Returns:
+        (list of (int, int, int)): (row, col, byte) of each cell of the
+        stencil that must match
     """
-    array = []
-    with open(file_name, 'r') as file:
-        for line in file.readlines():
-            array.append(list(line[:-1]))  # drop newline
-    return array
+    return [(row, col, ord(char))
+            for row, line in enumerate(stencil)
+            for col, char in enumerate(line) if char != wildcard]
 
 
-def index_array(array, row, col):
+def stencil_mask(grid, stencil, wildcard='.'):
     """
-    Index a 2d array while disallowing negative index
+    Compare a stencil against every placement in the grid at once, each
+    stencil cell is one comparison of a shifted slice of the whole grid
 
     Args:
-        array (2d array)
+        grid (Grid): crossword to search in
 
-        row (int)
+        stencil (list of str): rows of a 2d pattern, all the same length
 
-        col (int)
+        wildcard (str): character matching any cell
 
     Returns:
-        value at array(row, col)
+        mask (numpy bool array): true where the stencil's top left corner
+        can be placed for a match
     """
-    if (row < 0) or (col < 0):
-        raise IndexError
-    return array[row][col]
+    cells = grid.to_numpy()
+    rows = grid.height - len(stencil) + 1
+    cols = grid.width - len(stencil[0]) + 1
+    mask = np.ones((max(rows, 0), max(cols, 0)), dtype=bool)
+    for row, col, byte in stencil_cells(stencil, wildcard):
+        mask &= cells[row:row + rows, col:col + cols] == byte
+    return mask
 
 
-def look_for_pattern(array, row_num, col_num, target_pattern):
+def find_stencil(grid, stencil, wildcard='.'):
     """
-    Searches for target_pattern in an array of values, will match target
-    pattern in any direction (forward, backward, diagonal, up, down)
     Args:
-        array (2d array): 2d array of values to search in
-
-        row_num (int): row number to start search in
-
-        col_num (int): col number to start search in
-
-        target_pattern (list of str): list of single values to search
-        for in order
-    Return:
-        number of matches starting at array(row_num, col_num)
-    """
-    search_directions = list(product([-1, 0, 1], [-1, 0, 1]))
-    search_directions.remove((0, 0))
-    matches = []
-    for row_dir, col_dir in search_directions:
-        possible_match = []
-        for index, pattern in enumerate(target_pattern):
-            row_off = row_dir*(index)
-            col_off = col_dir*(index)
-            possible_match.append((row_num + row_off, col_num + col_off))
-            try:
-                adjacent_value = index_array(array,
-                                             row_num + row_off,
-                                             col_num + col_off)
-            except IndexError:
-                break
-            if adjacent_value != pattern:
-                break
-        else:
-            matches.append(possible_match)
-    return matches
-
-
-def look_for_diagonal_pattern(array, row_num, col_num, target_pattern):
-    """
-    Searches for target_pattern in an array of values, will match target
-    pattern in only diagonal directions
+        grid (Grid): crossword to search in
+
+        stencil (list of str): rows of a 2d pattern, all the same length
+
+        wildcard (str): character matching any cell
+
+    Returns:
+        (list of (int, int)): position of the top left corner of every match
+    """
+    if np is not None:
+        return [tuple(position) for position in
+                np.argwhere(stencil_mask(grid, stencil, wildcard)).tolist()]
+
+    checks = [(row * grid.stride + col, byte)
+              for row, col, byte in stencil_cells(stencil, wildcard)]
+    cells = grid.cells
+    found = []
+    for row in range(grid.height - len(stencil) + 1):
+        for col in range(grid.width - len(stencil[0]) + 1):
+            start = grid.index(row, col)
+            for offset, byte in checks:
+                if cells[start + offset] != byte:
+                    break
+            else:
+                found.append((row, col))
+    return found
+
+
+def count_stencils(grid, stencils, wildcard='.'):
+    """
     Args:
-        array (2d array): 2d array of values to search in
-
-        row_num (int): row number to start search in
-
-        col_num (int): col number to start search in
-
-        target_pattern (list of str): list of single values to search
-        for in order
-    Return:
-        number of matches starting at array(row_num, col_num)
-    """
-    search_directions = list(product([-1, 1], [-1, 1]))
-    matches = []
-    for row_dir, col_dir in search_directions:
-        possible_match = []
-        for index, pattern in enumerate(target_pattern):
-            row_off = row_dir*(index)
-            col_off = col_dir*(index)
-            possible_match.append((row_num + row_off, col_num + col_off))
-            try:
-                adjacent_value = index_array(array,
-                                             row_num + row_off,
-                                             col_num + col_off)
-            except IndexError:
-                break
-            if adjacent_value != pattern:
-                break
-        else:
-            matches.append(possible_match)
-    return matches
+        grid (Grid): crossword to search in
+
+        stencils (list of list of str): 2d patterns to count
+
+        wildcard (str): character matching any cell
+
+    Returns:
+        (int): total number of matches of all the stencils
+    """
+    if np is not None:
+        return sum(int(np.count_nonzero(stencil_mask(grid, stencil,
+                                                     wildcard)))
+                   for stencil in stencils)
+    return sum(len(find_stencil(grid, stencil, wildcard))
+               for stencil in stencils)
 
 
 def solve_part_1(file_name):
@@ -128,16 +420,8 @@ def solve_part_1(file_name):
     Returns:
         the count of 'XMAS' in puzzle
     """
-    array = load_puzzle_input(file_name)
-    matches = []
-    target_pattern = ['X', 'M', 'A', 'S']
-    for row_number, row in enumerate(array):
-        for column_number, value in enumerate(row):
-            matches = matches + look_for_pattern(array,
-                                                 row_number,
-                                                 column_number,
-                                                 target_pattern)
-    return len(matches)
+    grid = load_puzzle_input(file_name)
+    return WordSearch(['XMAS']).search(grid)['XMAS']
 
 
 def solve_part_2(file_name):
@@ -148,25 +432,8 @@ def solve_part_2(file_name):
     Returns:
         the count of 'MAS' in the shape of an X in the puzzle
     """
-    array = load_puzzle_input(file_name)
-    matches = []
-    target_pattern = ['M', 'A', 'S']
-    for row_number, row in enumerate(array):
-        for column_number, value in enumerate(row):
-            matches = matches + look_for_diagonal_pattern(array,
-                                                          row_number,
-                                                          column_number,
-                                                          target_pattern)
-
-    # position 2 will always be an 'A', match is only valid if position
-    # 2 appears twice in the full list of matches
-    xmas_positions = []
-    for index, match in enumerate(matches):
-        for match_comp in matches[0:index] + matches[index+1:]:
-            if match_comp[1] == match[1]:
-                xmas_positions.append(match[1])
-    # reduce duplicate matches by converting to set
-    return len(set(xmas_positions))
+    grid = load_puzzle_input(file_name)
+    return count_stencils(grid, XMAS_STENCILS)
 
 
 if __name__ == '__main__':
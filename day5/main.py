@@ -5,10 +5,32 @@ https://adventofcode.com/2024/day/4
 __author__ = "Conner Beard"
 
 import os
+import sys
 import time
 import math
+from collections import defaultdict, deque
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import cached_parse  # noqa: E402
+from common.loader import MappedInput  # noqa: E402
+from common.profiling import profile  # noqa: E402
 
+try:
+    import numpy as np
+except ImportError:  # the 'array' mode needs numpy
+    np = None
+
+DEFAULT_MODE = 'list' if np is None else 'array'
+# the loader DEFAULT_MODE parses with, timed by common.benchmark
+DEFAULT_LOADER = 'load_puzzle_input' if np is None else 'load_puzzle_matrix'
+# bytes of temporary arrays per numpy pass, sets how many orders a batch
+# holds
+BATCH_BYTES = 1 << 26
+# page numbers index the precedence matrix so they must be below this
+PAGE_LIMIT = 1 << 12
+
+
+@cached_parse
 def load_puzzle_input(file_name):
     """
     Read in the crossword puzzle
@@ -23,25 +45,270 @@ def load_puzzle_input(file_name):
         orders (list of list of int): a list of numbers that may or may not
         follow the ordering guideline in rules
     """
-    rules = []
-    orders = []
-    with open(file_name, 'r') as file:
-        for line in file.readlines():
-            if '|' in line:
-                rule = list(map(int, line.strip('\n').split('|')))
-                rules.append(rule)
-            elif ',' in line:
-                order = list(map(int, line.strip('\n').split(',')))
-                orders.append(order)
+    with MappedInput(file_name) as puzzle:
+        rows = puzzle.int_rows()
+    # rules and orders are seperated by the first blank line
+    if [] in rows:
+        split = rows.index([])
+    else:
+        split = len(rows)
+    rules = rows[:split]
+    orders = [order for order in rows[split:] if order]
     return rules, orders
 
 
+@cached_parse
+def load_puzzle_matrix(file_name):
+    """
+    Read in the rules as a dense precedence matrix and the orders as one
+    padded matrix, page numbers are small so they index the matrix directly
+
+    Args:
+        file_name (ascii text file): puzzle input, page numbers in
+        0 .. PAGE_LIMIT - 1
+
+    Returns:
+        precedes (numpy bool array): precedes[X, Y] is true if a rule says
+        page X must be printed before page Y. The last row and column stand
+        for the padding page and are all false
+
+        orders (numpy int64 array): one order per row, short orders are
+        padded with the padding page
+
+        lengths (numpy int64 array): number of pages in each order
+    """
+    with MappedInput(file_name) as puzzle:
+        values, counts = puzzle.line_ints()
+    values = np.asarray(values, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+    # rules and orders are seperated by the first blank line
+    blank = np.flatnonzero(counts == 0)
+    split = int(blank[0]) if len(blank) else len(counts)
+    rule_values = int(counts[:split].sum())
+    rules = values[:rule_values].reshape(-1, 2)
+    order_values = values[rule_values:]
+    lengths = counts[split:][counts[split:] > 0]
+    if len(values) and (values.min() < 0 or values.max() >= PAGE_LIMIT):
+        raise ValueError(f'page numbers must be in 0 .. {PAGE_LIMIT - 1}')
+
+    pad_page = int(values.max()) + 1 if len(values) else 0
+    precedes = np.zeros((pad_page + 1, pad_page + 1), dtype=bool)
+    precedes[rules[:, 0], rules[:, 1]] = True
+
+    width = int(lengths.max()) if len(lengths) else 0
+    orders = np.full((len(lengths), width), pad_page, dtype=np.int64)
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    cols = np.arange(len(order_values)) - np.repeat(starts, lengths)
+    orders[rows, cols] = order_values
+    return precedes, orders, lengths
+
+
+class PageRules():
+    """
+    Precedence lookups built once from the page ordering rules.
+
+    For every page the set of pages that must be printed after it is kept,
+    along with the same set as an integer bitmask with bit Y set for each
+    page Y. An order is checked with one and of the page's mask against the
+    mask of the pages already seen, no matter how many rules there are.
+    """
+
+    def __init__(self, rules):
+        """
+        Args:
+            rules (list of list of two int): each rule [X, Y] means page X
+            must be printed before page Y
+        """
+        self.after = defaultdict(set)
+        self.masks = defaultdict(int)
+        for first, second in rules:
+            self.add_rule(first, second)
+
+    def add_rule(self, first, second):
+        """
+        Args:
+            first (int): page that must be printed first
+
+            second (int): page that must be printed after first
+        """
+        self.after[first].add(second)
+        self.masks[first] = self.masks[first] | (1 << second)
+
+    def remove_rule(self, first, second):
+        """
+        Args:
+            first (int): page that must be printed first
+
+            second (int): page that must be printed after first
+        """
+        self.after[first].discard(second)
+        self.masks[first] = self.masks[first] & ~(1 << second)
+
+    def violation(self, order):
+        """
+        Args:
+            order (list of int): pages in print order
+
+        Returns:
+            (list of two int): the first rule broken by the order, or None
+        """
+        masks = self.masks
+        seen = 0
+        for page in order:
+            # a page printed earlier that the rules say must come later
+            if masks[page] & seen:
+                earlier = next(value for value in order
+                               if value in self.after[page])
+                return [page, earlier]
+            seen = seen | (1 << page)
+        return None
+
+    def repair(self, order):
+        """
+        Topologically sort the pages of an order with Kahn's algorithm,
+        using only the rules between pages in the order
+
+        Args:
+            order (list of int): pages in print order
+
+        Returns:
+            (list of int): the pages in an order that follows every rule
+        """
+        pages = set(order)
+        before_count = dict.fromkeys(order, 0)
+        for page in order:
+            for later in self.after[page] & pages:
+                before_count[later] = before_count[later] + 1
+        ready = deque(page for page in order if before_count[page] == 0)
+        fixed = []
+        while ready:
+            page = ready.popleft()
+            fixed.append(page)
+            for later in self.after[page] & pages:
+                before_count[later] = before_count[later] - 1
+                if before_count[later] == 0:
+                    ready.append(later)
+        if len(fixed) != len(pages):
+            raise ValueError(f'the rules for order {order} contain a cycle')
+        return fixed
+
+
+class PageOrderIndex():
+    """
+    Rules and orders that arrive over time, with the verdict and middle page
+    of every order kept up to date.
+
+    A rule between two pages can only change the verdict of orders holding
+    both pages, so each page maps to the orders containing it and a rule
+    change re-evaluates just those orders. The sums answering both parts are
+    updated as verdicts change.
+    """
+
+    def __init__(self, rules=(), orders=()):
+        """
+        Args:
+            rules (list of list of two int): initial ordering rules
+
+            orders (list of list of int): initial orders
+        """
+        self.rules = PageRules(rules)
+        self.orders = []
+        # verdict of each order, and its middle page once repaired, None if
+        # the rules between its pages contain a cycle
+        self.good = []
+        self.middles = []
+        # page mapped to the ids of the orders containing it
+        self.page_orders = defaultdict(set)
+        self.good_middle_sum = 0
+        self.fixed_middle_sum = 0
+        for order in orders:
+            self.add_order(order)
+
+    def add_order(self, order):
+        """
+        Args:
+            order (list of int): pages in print order
+
+        Returns:
+            (int): id of the order
+        """
+        order_id = len(self.orders)
+        self.orders.append(list(order))
+        self.good.append(True)
+        self.middles.append(None)
+        for page in order:
+            self.page_orders[page].add(order_id)
+        self._evaluate(order_id)
+        return order_id
+
+    def add_rule(self, first, second):
+        """
+        Args:
+            first (int): page that must be printed first
+
+            second (int): page that must be printed after first
+
+        Returns:
+            (int): number of orders re-evaluated
+        """
+        self.rules.add_rule(first, second)
+        return self._reevaluate(first, second)
+
+    def remove_rule(self, first, second):
+        """
+        Args:
+            first (int): page that must be printed first
+
+            second (int): page that must be printed after first
+
+        Returns:
+            (int): number of orders re-evaluated
+        """
+        self.rules.remove_rule(first, second)
+        return self._reevaluate(first, second)
+
+    def _reevaluate(self, first, second):
+        affected = self.page_orders[first] & self.page_orders[second]
+        for order_id in affected:
+            self._evaluate(order_id)
+        return len(affected)
+
+    def _evaluate(self, order_id):
+        self._count(order_id, -1)
+        order = self.orders[order_id]
+        self.good[order_id] = self.rules.violation(order) is None
+        if self.good[order_id]:
+            fixed_order = order
+        else:
+            try:
+                fixed_order = self.rules.repair(order)
+            except ValueError:
+                fixed_order = None
+        if fixed_order is None:
+            self.middles[order_id] = None
+        else:
+            self.middles[order_id] = fixed_order[math.floor(len(order)/2)]
+        self._count(order_id, 1)
+
+    def _count(self, order_id, sign):
+        middle = self.middles[order_id]
+        if middle is None:
+            return
+        if self.good[order_id]:
+            self.good_middle_sum = self.good_middle_sum + sign * middle
+        else:
+            self.fixed_middle_sum = self.fixed_middle_sum + sign * middle
+
+
+@profile
 def is_order_good(rules, order):
     """
     Test if any of the order element ordering violates the rules in rules
     Args:
-        rules (list of list of two int): each element describes an ordering
-        rule for order
+        rules (PageRules or list of list of two int): each element describes
+        an ordering rule for order, pass a PageRules when testing many orders
+        so it is only built once
 
         order (list of int): a list of values that may or may not follow the
         ordering in rules
@@ -49,28 +316,102 @@ def is_order_good(rules, order):
         (True or rule_pair): if the order is good return True, otherwise
         return the first rule causing a failiure
     """
-    for rule in rules:
-        found_order = []
-        for value in order:
-            if value == rule[0]:
-                found_order.append(0)
-            if value == rule[1]:
-                found_order.append(1)
-        if found_order == [1, 0]:
-            return rule
-    else:
+    if not isinstance(rules, PageRules):
+        rules = PageRules(rules)
+    rule = rules.violation(order)
+    if rule is None:
         return True
+    return rule
+
 
+def _batch_rows(row_bytes):
+    # orders per numpy pass keeping the temporaries within BATCH_BYTES
+    return max(1, BATCH_BYTES // max(1, row_bytes))
 
-def solve_part_1(file_name):
+
+@profile
+def find_good_orders(precedes, orders):
+    """
+    Test every order at once, an order is good if no pair of its pages is
+    printed against a rule. Every pair of positions is one gather from the
+    precedence matrix
+
+    Args:
+        precedes (numpy bool array): see load_puzzle_matrix
+
+        orders (numpy int64 array): padded orders, see load_puzzle_matrix
+
+    Returns:
+        good (numpy bool array): true for each good order
+    """
+    earlier, later = np.triu_indices(orders.shape[1], 1)
+    good = np.empty(len(orders), dtype=bool)
+    # two int64 page indices and a bool per pair of positions
+    batch = _batch_rows(17 * len(later))
+    for start in range(0, len(orders), batch):
+        block = orders[start:start + batch]
+        # a later page that must be printed before an earlier one
+        broken = precedes[block[:, later], block[:, earlier]]
+        good[start:start + batch] = ~broken.any(axis=1)
+    return good
+
+
+@profile
+def repaired_middles(precedes, orders, lengths):
+    """
+    Find the middle page of each order once it is repaired without sorting
+    it, a page's position in the repaired order is the number of the order's
+    pages that must be printed before it
+
+    Args:
+        precedes (numpy bool array): see load_puzzle_matrix
+
+        orders (numpy int64 array): padded orders, see load_puzzle_matrix
+
+        lengths (numpy int64 array): number of pages in each order
+
+    Returns:
+        middles (numpy int64 array): middle page of each repaired order, -1
+        where the rules do not fix the position of every page
+    """
+    middles = np.full(len(orders), -1, dtype=np.int64)
+    width = orders.shape[1]
+    padding = np.arange(width) >= lengths[:, None]
+    # a bool per pair of pages and an int64 position per page
+    batch = _batch_rows(width * width + 8 * width)
+    for start in range(0, len(orders), batch):
+        block = orders[start:start + batch]
+        block_padding = padding[start:start + batch]
+        positions = precedes[block[:, :, None], block[:, None, :]].sum(axis=1)
+        # positions are only fixed if they are exactly 0 .. length - 1
+        positions[block_padding] = width
+        fixed = (np.sort(positions, axis=1) ==
+                 np.where(block_padding, width, np.arange(width))).all(axis=1)
+        middle = positions == (lengths[start:start + batch] // 2)[:, None]
+        rows, cols = np.nonzero(middle & fixed[:, None])
+        middles[start + rows] = block[rows, cols]
+    return middles
+
+
+def solve_part_1(file_name, mode=DEFAULT_MODE):
     """
     Args:
         file_name (ascii text file): puzzle input
 
+        mode ('list' or 'array'): test orders one by one or all at once
+        against a numpy precedence matrix
+
     Returns:
         the sum of middle values in the correct orders in the puzzle input
     """
+    if mode == 'array':
+        precedes, orders, lengths = load_puzzle_matrix(file_name)
+        good = find_good_orders(precedes, orders)
+        middles = orders[np.arange(len(orders)), lengths // 2]
+        return int(middles[good].sum())
+
     rules, orders = load_puzzle_input(file_name)
+    rules = PageRules(rules)
     good_orders = []
     for order in orders:
         if is_order_good(rules, order) is True:
@@ -79,16 +420,35 @@ def solve_part_1(file_name):
     return sum(good_orders)
 
 
-def solve_part_2(file_name):
+def solve_part_2(file_name, mode=DEFAULT_MODE):
     """
     Args:
         file_name (ascii text file): puzzle input
 
+        mode ('list' or 'array'): test and repair orders one by one or all
+        at once against a numpy precedence matrix
+
     Returns:
         the sum of middle values in the incorrect orders in the puzzle input
         once they have been re-ordered to be correct
     """
+    if mode == 'array':
+        precedes, orders, lengths = load_puzzle_matrix(file_name)
+        bad = ~find_good_orders(precedes, orders)
+        middles = repaired_middles(precedes, orders[bad], lengths[bad])
+        total = int(middles[middles >= 0].sum())
+        # orders the rules only partly order are sorted one by one
+        unfixed = np.flatnonzero(middles < 0)
+        if len(unfixed):
+            rules = PageRules(np.argwhere(precedes).tolist())
+            for order, length in zip(orders[bad][unfixed].tolist(),
+                                     lengths[bad][unfixed].tolist()):
+                fixed_order = rules.repair(order[:length])
+                total = total + fixed_order[math.floor(length/2)]
+        return total
+
     rules, orders = load_puzzle_input(file_name)
+    rules = PageRules(rules)
     bad_orders = []
     for order in orders:
         if is_order_good(rules, order) is not True:
@@ -96,17 +456,8 @@ def solve_part_2(file_name):
 
     fixed_orders = []
     for order in bad_orders:
-        fixed_order = order
-        while True:
-            result = is_order_good(rules, fixed_order)
-            if result is True:
-                fixed_orders.append(fixed_order[math.floor(len(fixed_order)/2)])
-                break
-            else:
-                pos_1 = fixed_order.index(result[0])
-                pos_2 = fixed_order.index(result[1])
-                fixed_order[pos_1] = result[1]
-                fixed_order[pos_2] = result[0]
+        fixed_order = rules.repair(order)
+        fixed_orders.append(fixed_order[math.floor(len(fixed_order)/2)])
 
     return sum(fixed_orders)
 
@@ -5,9 +5,18 @@ https://adventofcode.com/2024/day/4
 __author__ = "Conner Beard"
 
 import os
+import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import cached_parse  # noqa: E402
+from common.grid import Grid  # noqa: E402
+from common.profiling import profile  # noqa: E402
+from common.progress import Progress  # noqa: E402
 
+
+@cached_parse
 def load_puzzle_input(file_name):
     """
     Read in the room map
@@ -16,126 +25,231 @@ def load_puzzle_input(file_name):
         file_name (ascii text file): puzzle input
 
     Returns:
-        a 2d array holding the room map
+        grid (Grid): the room map, padding cells mark the outside of the room
 
     """
-    array = []
-    with open(file_name, 'r') as file:
-        for line in file.readlines():
-            array.append(list(line[:-1]))  # drop newline
-    return array
+    return Grid.from_file(file_name)
 
 
-directions = {'^': (-1, 0), '>': (0, 1), 'v': (1, 0), '<': (0, -1)}
+# guard headings in the order they turn, matching Grid.orthogonal_offsets
+headings = b'^>v<'
+OBSTACLE = ord('#')
 
 
-def find_guard(array):
+def find_guard(grid):
     """
     search the 2d map for the guard's posigion
 
     Aargs:
-        array (list of lists): map of the room with guard and obsticles
+        grid (Grid): map of the room with guard and obsticles
     Returns:
         (row_num, col_num): position of the guard in the room
     """
-    for row_num, row in enumerate(array):
-        for col_num, value in enumerate(row):
-            if value in directions.keys():
-                return [row_num, col_num]
-
-
-def index_array(array, row, col):
-    """
-    Index a 2d array while disallowing negative index
-
-    Args:
-        array (2d array)
-
-        row (int)
+    for heading in headings:
+        index = grid.cells.find(heading)
+        if index != -1:
+            return list(grid.position(index))
 
-        col (int)
 
-    Returns:
-        value at array(row, col)
+class GuardSimulator():
     """
-    if (row < 0) or (col < 0):
-        raise IndexError
-    return array[row][col]
+    Moves the guard from obstacle to obstacle instead of one cell at a time.
 
-
-class PositionTracker():
-    """
-    A class to keep track of where the guard has already been to determine if
-    they are stuck in a loop, if the guard is ever in the same location facing
-    the same direction then they are stuck
+    For every cell and heading a jump table holds the cell the guard stops
+    in, the last cell before the next obstacle ahead, or the padding cell
+    just outside the room if there is no obstacle ahead. Following a patrol
+    then costs one lookup per turn however long the corridors are.
     """
 
-    def __init__(self):
-        self.position_history = []
-
-    def check_stuck(self, d):
-        if d in self.position_history:
-            return True
+    def __init__(self, grid):
+        """
+        Args:
+            grid (Grid): the room map with the guard, padded by one cell
+        """
+        self.grid = grid
+        self.offsets = grid.orthogonal_offsets
+        self.start = grid.index(*find_guard(grid))
+        self.start_heading = headings.index(grid.cells[self.start])
+        # stops[heading][index] is where a guard at index heading that way
+        # stops, only filled in for cells inside the room
+        self.stops = [self._build_stops(heading) for heading in range(4)]
+        # one byte per (cell, heading) the guard turns at, reused by every
+        # is_loop call and cleared by it on the way out
+        self._turns = bytearray(len(grid.cells) * 4)
+
+    def _build_stops(self, heading):
+        grid = self.grid
+        cells = grid.cells
+        offset = self.offsets[heading]
+        stops = [0] * len(cells)
+        if offset in (1, -1):
+            lines = [list(range(grid.index(row, 0), grid.index(row, grid.width)))
+                     for row in range(grid.height)]
         else:
-            return False
-
-    def add(self, d):
-        self.position_history.append(d)
-
-    def clear(self):
-        self.position_history = []
-
-
-def move_guard(array, pos):
+            lines = [list(range(grid.index(0, col),
+                                grid.index(grid.height, col), grid.stride))
+                     for col in range(grid.width)]
+        for line in lines:
+            # sweep each line from the far end of the guard's travel
+            if offset > 0:
+                line.reverse()
+            stop = line[0] + offset
+            for index in line:
+                if cells[index] == OBSTACLE:
+                    stop = index - offset
+                else:
+                    stops[index] = stop
+        return stops
+
+    def patrol(self):
+        """
+        Follow the guard from the start until they leave the room
+
+        Returns:
+            visited (bytearray): one byte per cell of the grid, 1 for every
+            cell the guard visited
+        """
+        cells = self.grid.cells
+        pad_value = self.grid.pad_value
+        visited = bytearray(len(cells))
+        index = self.start
+        heading = self.start_heading
+        while True:
+            offset = self.offsets[heading]
+            stop = self.stops[heading][index]
+            leaving = cells[stop] == pad_value
+            last = stop - offset if leaving else stop
+            count = (last - index) // offset + 1
+            if offset > 0:
+                visited[index:last + 1:offset] = b'\x01' * count
+            else:
+                visited[last:index + 1:-offset] = b'\x01' * count
+            if leaving:
+                return visited
+            index = stop
+            heading = (heading + 1) % 4
+
+    def candidates(self):
+        """
+        An extra obstacle can only change the patrol if it is placed on the
+        path, and the patrol is unchanged until the guard first reaches it,
+        so every trial can start from the step just before that.
+
+        Yields:
+            obstacle (int): flat index of a cell on the patrol path, in the
+            order the guard first reaches them
+
+            index (int): flat index of the guard just before first stepping
+            into obstacle
+
+            heading (int): index into headings the guard is facing then
+        """
+        cells = self.grid.cells
+        pad_value = self.grid.pad_value
+        reached = bytearray(len(cells))
+        reached[self.start] = 1
+        index = self.start
+        heading = self.start_heading
+        while True:
+            offset = self.offsets[heading]
+            stop = self.stops[heading][index]
+            leaving = cells[stop] == pad_value
+            last = stop - offset if leaving else stop
+            for cell in range(index + offset, last + offset, offset):
+                if not reached[cell]:
+                    reached[cell] = 1
+                    yield cell, cell - offset, heading
+            if leaving:
+                return
+            index = stop
+            heading = (heading + 1) % 4
+
+    @profile
+    def is_loop(self, index=None, heading=None, obstacle=None):
+        """
+        Test if the guard patrols in a loop forever, only the turns are
+        followed and a loop is found when the guard turns at the same cell
+        with the same heading twice
+
+        Args:
+            index (int): flat index the guard starts at, defaults to the
+            guard's position on the map
+
+            heading (int): index into headings the guard starts facing
+
+            obstacle (int): flat index of an extra obstacle to place in the
+            room, or None
+
+        Returns:
+            (bool): True if the guard never leaves the room
+        """
+        if index is None:
+            index = self.start
+            heading = self.start_heading
+        cells = self.grid.cells
+        pad_value = self.grid.pad_value
+        offsets = self.offsets
+        stops = self.stops
+        turns = self._turns
+        touched = []
+        stuck = False
+        while True:
+            offset = offsets[heading]
+            stop = stops[heading][index]
+            if obstacle is not None:
+                # the extra obstacle cuts the jump short if it is on the way
+                steps = (obstacle - index) // offset
+                if steps * offset == obstacle - index and \
+                        0 < steps <= (stop - index) // offset:
+                    stop = obstacle - offset
+            if cells[stop] == pad_value:
+                break
+            turn = stop * 4 + heading
+            if turns[turn]:
+                stuck = True
+                break
+            turns[turn] = 1
+            touched.append(turn)
+            index = stop
+            heading = (heading + 1) % 4
+
+        for turn in touched:
+            turns[turn] = 0
+        return stuck
+
+
+# each pool worker's own simulator, built once by _start_worker
+_worker_simulator = None
+
+
+def _start_worker(grid):
+    global _worker_simulator
+    _worker_simulator = GuardSimulator(grid)
+
+
+def count_loops(trials, simulator=None, progress=None):
     """
-    Decide where the guard will move next and change the map to reflect that
-
     Args:
-        array (list of lists): the room map
-
-        pos (int, int, str): position where the guard currently is
-
-    Returns
-        array (list of lists): the updated room map
-
-        new_pos (int, int, str): position of where the guard moved to
-    """
-
-    move_key = array[pos[0]][pos[1]]
-    move = directions[move_key]
-
-    new_move_key = list(directions.keys())[(list(directions.keys()).index(move_key)+1) % 4]
-
-    try:
-        if (pos[0] + move[0]) < 0:
-            raise IndexError
-        if (pos[1] + move[1]) < 0:
-            raise IndexError
-        if array[pos[0] + move[0]][pos[1] + move[1]] == '#':
-            new_pos = [pos[0], pos[1], new_move_key]
-            array[new_pos[0]][new_pos[1]] = new_move_key
-        else:
-            new_pos = [pos[0] + move[0], pos[1] + move[1], move_key]
-            array[pos[0]][pos[1]] = 'X'
-            array[new_pos[0]][new_pos[1]] = move_key
-    except IndexError:
-        array[pos[0]][pos[1]] = 'X'
-        new_pos = None
+        trials (list of (int, int, int)): (obstacle, index, heading) trials
+        as yielded by GuardSimulator.candidates
 
-    return array, new_pos
+        simulator (GuardSimulator): simulator to run the trials on, defaults
+        to the pool worker's simulator
 
+        progress (Progress): updated after every trial, or None
 
-def count_x(array):
-    """
-    count the number of "X" in the map, this denotes where the guard has been
+    Returns:
+        (int): the number of trials where the guard got stuck
     """
-    x_count = 0
-    for row_num, row in enumerate(array):
-        for col_num, value in enumerate(row):
-            if value == 'X':
-                x_count = x_count + 1
-    return x_count
-
+    if simulator is None:
+        simulator = _worker_simulator
+    stuck_counter = 0
+    for obstacle, index, heading in trials:
+        if simulator.is_loop(index, heading, obstacle):
+            stuck_counter = stuck_counter + 1
+        if progress is not None:
+            progress.update()
+    return stuck_counter
 
 
 def solve_part_1(file_name):
@@ -146,56 +260,40 @@ def solve_part_1(file_name):
     Returns:
         the number of positions that the guard visited
     """
-    array = load_puzzle_input(file_name)
+    simulator = GuardSimulator(load_puzzle_input(file_name))
+    return simulator.patrol().count(1)
 
-    pos = find_guard(array)
 
-    while pos is not None:
-        array, pos = move_guard(array, pos)
-
-    return count_x(array)
-
-
-def solve_part_2(file_name):
+def solve_part_2(file_name, jobs=1):
     """
     Args:
         file_name (ascii text file): puzzle input
 
+        jobs (int): number of worker processes, the map is sent to each
+        worker once and the trials are dealt out between them
+
     Returns:
         the number of iterations where the guard got stuck
     """
-    map = load_puzzle_input(file_name)
-
-    size = 0
-    for row_num, row in enumerate(map):
-        for col_num, value in enumerate(map):
-            size = size + 1
-
-    stuck_counter = 0
-    progress = 0
-    for row_num, row in enumerate(map):
-        print(progress/size)
-        for col_num, value in enumerate(map):
-            progress = progress + 1
-            array = load_puzzle_input(file_name)
-
-            if array[row_num][col_num] == '.':
-                array[row_num][col_num] = '#'
-
-            pos = find_guard(array)
-
-            position_tracker = PositionTracker()
-
-            while pos is not None:
-                array, pos = move_guard(array, pos)
-                if position_tracker.check_stuck(pos):
-                    stuck_counter = stuck_counter + 1
-                    position_tracker.clear()
-                    break
-                else:
-                    position_tracker.add(pos)
-
-    return stuck_counter
+    room = load_puzzle_input(file_name)
+    simulator = GuardSimulator(room)
+    trials = list(simulator.candidates())
+    with Progress(len(trials), 'day 6 obstacle trials') as progress:
+        if jobs <= 1:
+            return count_loops(trials, simulator, progress)
+
+        # dealt round robin so every batch gets a similar mix of long and
+        # short trials, several batches per worker so progress can be shown
+        batches = [trials[batch::jobs * 8] for batch in range(jobs * 8)]
+        stuck_counter = 0
+        with ProcessPoolExecutor(max_workers=jobs,
+                                 initializer=_start_worker,
+                                 initargs=(room,)) as executor:
+            for batch, stuck in zip(batches,
+                                    executor.map(count_loops, batches)):
+                stuck_counter = stuck_counter + stuck
+                progress.update(len(batch))
+        return stuck_counter
 
 
 if __name__ == '__main__':
@@ -5,10 +5,16 @@ https://adventofcode.com/2024/day/7
 __author__ = "Conner Beard"
 
 import os
+import sys
 import time
 import math
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import cached_parse  # noqa: E402
+from common.loader import MappedInput  # noqa: E402
 
+
+@cached_parse
 def load_puzzle_input(file_name):
     """
 
@@ -18,14 +24,8 @@ def load_puzzle_input(file_name):
     Returns:
         equations (list of lists): list of equations with answer operand pairs
     """
-    equations = []
-    with open(file_name, 'r') as file:
-        for line in file.readlines():
-            result, operands = line.split(':')
-            result = int(result)
-            operands = operands.split()
-            operands = list(map(int, operands))
-            equations.append((result, operands))
+    with MappedInput(file_name) as puzzle:
+        equations = [(row[0], row[1:]) for row in puzzle.int_rows() if row]
     return equations
 
 
@@ -5,11 +5,17 @@ https://adventofcode.com/2024/day/8
 __author__ = "Conner Beard"
 
 import os
+import sys
 import time
 from collections import defaultdict
 import itertools
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import cached_parse  # noqa: E402
+from common.grid import Grid  # noqa: E402
 
+
+@cached_parse
 def load_puzzle_input(file_name):
     """
     Read in the crossword puzzle
@@ -18,29 +24,18 @@ def load_puzzle_input(file_name):
         file_name (ascii text file): puzzle input
 
     Returns:
-        rules (list of list of two int): a list of rules to apply to orders
-        to determine if each order is correct
-
-        orders (list of list of int): a list of numbers that may or may not
-        follow the ordering guideline in rules
+        grid (Grid): the antenna map
     """
-    array = []
-    with open(file_name, 'r') as file:
-        for line in file.readlines():
-            row = []
-            for value in line[:-1]:
-                row.append(value)
-            array.append(row)
+    return Grid.from_file(file_name, pad_width=0)
 
-    return array
 
-
-def get_frequencies(array):
+def get_frequencies(grid):
     unique = defaultdict(list)
-    for row_num, row in enumerate(array):
-        for col_num, value in enumerate(row):
-            if value != '.':
-                unique[value].append(((row_num), (col_num)))
+    empty = ord('.')
+    for index in grid.indices():
+        value = grid.cells[index]
+        if value != empty:
+            unique[chr(value)].append(grid.position(index))
     return unique
 
 
@@ -69,22 +64,11 @@ def find_antinodes_and_resonance(a, b):
     return antinodes
 
 
-def check_inside_bounds(array, values):
+def check_inside_bounds(grid, values):
     output = set()
-    row_min = 0
-    row_max = len(array) - 1
-    col_min = 0
-    col_max = len(array[0]) - 1
     for value in values:
-        if value[0] < row_min:
-            continue
-        if value[0] > row_max:
-            continue
-        if value[1] < col_min:
-            continue
-        if value[1] > col_max:
-            continue
-        output.add(value)
+        if grid.in_bounds(value[0], value[1]):
+            output.add(value)
 
     return output
 
@@ -97,15 +81,15 @@ def solve_part_1(file_name):
     Returns:
         the sum of middle values in the correct orders in the puzzle input
     """
-    array = load_puzzle_input(file_name)
-    frequecies = get_frequencies(array)
+    grid = load_puzzle_input(file_name)
+    frequecies = get_frequencies(grid)
 
     antinodes = []
     for key, value in frequecies.items():
         for antenna_1, antenna_2 in itertools.combinations(value, 2):
             antinodes = antinodes + [*find_antinodes(antenna_1, antenna_2)]
 
-    antinodes = check_inside_bounds(array, antinodes)
+    antinodes = check_inside_bounds(grid, antinodes)
 
     return len(antinodes)
 
@@ -119,8 +103,8 @@ def solve_part_2(file_name):
         the sum of middle values in the incorrect orders in the puzzle input
         once they have been re-ordered to be correct
     """
-    array = load_puzzle_input(file_name)
-    frequencies = get_frequencies(array)
+    grid = load_puzzle_input(file_name)
+    frequencies = get_frequencies(grid)
 
     antinodes = []
     for key, value in frequencies.items():
@@ -129,7 +113,7 @@ def solve_part_2(file_name):
         for antenna_1, antenna_2 in itertools.combinations(value, 2):
             antinodes = antinodes + find_antinodes_and_resonance(antenna_1, antenna_2)
 
-    antinodes = check_inside_bounds(array, antinodes)
+    antinodes = check_inside_bounds(grid, antinodes)
 
     return len(antinodes)
 
@@ -5,10 +5,16 @@ https://adventofcode.com/2024/day/X
 __author__ = "Conner Beard"
 
 import os
+import sys
 import time
 import math
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import cached_parse  # noqa: E402
+from common.progress import Progress  # noqa: E402
 
+
+@cached_parse
 def load_puzzle_input(file_name):
     """
 
@@ -16,9 +22,10 @@ def load_puzzle_input(file_name):
         file_name (ascii text file): puzzle input
 
     Returns:
+        disk_map (list of int): alternating file and free space lengths
     """
     with open(file_name, 'r') as file:
-        output = map(int, list(file.readlines()[0])[:-1])
+        output = list(map(int, file.readline().strip()))
 
     return output
 
@@ -81,6 +88,7 @@ def compress_memory_2(memory):
         a compressed version of the memory space following the problem algo
     """
     current_id = max([x if x is not None else 0 for x in memory])
+    progress = Progress(current_id, 'day 9 files moved')
     while current_id > 0:
         # get positions of block at block_id 
         current_block = []
@@ -108,8 +116,9 @@ def compress_memory_2(memory):
                 break
 
         current_id = current_id - 1
+        progress.update()
 
-    print(memory)
+    progress.close()
     return memory
 
 
@@ -5,9 +5,14 @@ https://adventofcode.com/2024/day/X
 __author__ = "Conner Beard"
 
 import os
+import sys
 import time
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import cached_parse  # noqa: E402
 
+
+@cached_parse
 def load_puzzle_input(file_name):
     """
 